@@ -0,0 +1,97 @@
+"""Per-host circuit breaker for upstream requests.
+
+When Swift Package Index or GitHub starts failing (timeouts, 429s, 5xx), every
+further request only adds load and makes the agent wait for another failure.
+After a run of consecutive failures the breaker opens and calls fail fast until
+a cool-down has passed; then a single trial request's outcome decides whether it
+closes again (the classic closed → open → half-open cycle).
+"""
+
+from __future__ import annotations
+
+import time
+from enum import StrEnum
+
+
+class BreakerState(StrEnum):
+    """Lifecycle states of a CircuitBreaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures; probes again after reset_timeout seconds."""
+
+    def __init__(self, *, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.reset()
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state, moving OPEN to HALF_OPEN once the cool-down has elapsed."""
+        if self._state is BreakerState.OPEN and time.monotonic() >= self._opened_at + self.reset_timeout:
+            self._state = BreakerState.HALF_OPEN
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the breaker may let another request through (0 if it would now)."""
+        state = self.state
+        if state is BreakerState.OPEN:
+            return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+        if state is BreakerState.HALF_OPEN and self._trial_started_at is not None:
+            return max(self._trial_started_at + self.reset_timeout - time.monotonic(), 0.0)
+        return 0.0
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now.
+
+        While half-open only one trial goes out. If its outcome is never recorded (the
+        call was cancelled, say), another trial is allowed after reset_timeout.
+        """
+        state = self.state
+        if state is BreakerState.CLOSED:
+            return True
+        if state is BreakerState.OPEN:
+            return False
+        # LEARN: Concurrent tool calls would otherwise all become "trials" and hit an
+        # upstream that may still be down — exactly the burst the breaker exists to stop.
+        now = time.monotonic()
+        if self._trial_started_at is not None and now < self._trial_started_at + self.reset_timeout:
+            return False
+        self._trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker and forget earlier failures."""
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold or on a failed trial."""
+        self._failures += 1
+        # LEARN: A single failure while half-open reopens immediately — the upstream has
+        # not recovered, and waiting for a full threshold would just recreate the overload.
+        if self.state is BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+        self._trial_started_at = None
+
+    def reset(self) -> None:
+        """Return to a fresh closed state."""
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at: float | None = None
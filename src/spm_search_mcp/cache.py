@@ -0,0 +1,52 @@
+"""Small in-process TTL + LRU cache for upstream responses.
+
+Agents often repeat a search while iterating (paging back, rephrasing) and
+re-read popular READMEs. Keeping recent responses in memory for a few minutes
+turns those repeats into dictionary lookups instead of network round-trips.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """Least-recently-used cache whose entries expire ttl seconds after being stored.
+
+    Only successful responses should be stored — errors must always go back to
+    the network so a transient failure is never replayed to the agent.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # LEARN: OrderedDict keeps insertion order and can move a key to the end in O(1),
+        # which is all an LRU needs — the first entry is always the least recently used.
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store value under key, evicting the least recently used entries past maxsize."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
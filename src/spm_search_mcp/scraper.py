@@ -7,18 +7,27 @@ fetches the HTML search page, and parses results into PackageResult models
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
-from urllib.parse import quote_plus, urljoin
+import math
+import os
+import re
+from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup, Tag
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
+from spm_search_mcp.breaker import CircuitBreaker, CircuitOpenError
+from spm_search_mcp.cache import TTLCache
 from spm_search_mcp.models import PackageResult, Platform, ProductType, SearchResponse
 
 logger = logging.getLogger(__name__)
 
 SPI_BASE_URL = "https://swiftpackageindex.com"
 SPI_SEARCH_URL = f"{SPI_BASE_URL}/search"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+GITHUB_API_URL = "https://api.github.com"
 
 # LEARN: httpx is used for all network calls — both search and README fetching.
 GITHUB_HEADERS = {
@@ -26,6 +35,151 @@ GITHUB_HEADERS = {
     "Accept": "text/html",
 }
 
+# LEARN: One long-lived AsyncClient per host keeps TCP+TLS connections alive across
+# tool calls. Opening a fresh client per call pays a full handshake every time.
+_CLIENT_HEADERS = {
+    GITHUB_RAW_URL: GITHUB_HEADERS,
+    # The raw media type makes the readme endpoint return the file itself, not base64 JSON.
+    GITHUB_API_URL: {"User-Agent": GITHUB_HEADERS["User-Agent"], "Accept": "application/vnd.github.raw+json"},
+}
+# LEARN: HTTP/2 multiplexes concurrent requests (search, prefetch, README probes) over one
+# connection per host, and brotli compresses HTML noticeably better than gzip.
+_COMMON_HEADERS = {"Accept-Encoding": "gzip, br"}
+# LEARN: Agents work in bursts with pauses in between; keeping idle connections for five
+# minutes (httpx defaults to 5 seconds) means the next burst skips the TLS handshake.
+_CLIENT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=300)
+_clients: dict[str, httpx.AsyncClient] = {}
+_clients_lock: asyncio.Lock | None = None
+
+
+async def _get_client(base_url: str) -> httpx.AsyncClient:
+    """Return the shared AsyncClient for base_url, creating it on first use."""
+    global _clients_lock  # noqa: PLW0603 — created lazily so it belongs to the running loop
+    client = _clients.get(base_url)
+    if client is not None and not client.is_closed:
+        return client
+    if _clients_lock is None:
+        _clients_lock = asyncio.Lock()
+    async with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers={**_COMMON_HEADERS, **_CLIENT_HEADERS.get(base_url, {})},
+                # LEARN: Each connection attempt gets its own connect timeout, so it is kept
+                # short: two 5 s attempts still fail faster than one 15 s attempt would.
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                follow_redirects=True,
+                # LEARN: Transport retries only cover failed connection attempts, so they are
+                # safe for any request and absorb a one-off DNS or TCP hiccup. Passing a
+                # transport means http2 and limits must be configured on it, not the client.
+                transport=httpx.AsyncHTTPTransport(http2=True, limits=_CLIENT_LIMITS, retries=1),
+            )
+            _clients[base_url] = client
+    return client
+
+
+# LEARN: Agents often repeat a search (paging back, rephrasing) or re-read the same README.
+# Short-lived caches turn those repeats into memory hits. Only successes are stored.
+_search_cache: TTLCache[tuple[str, int], bytes] = TTLCache(maxsize=256, ttl=300)
+_readme_cache: TTLCache[tuple[str, str], str] = TTLCache(maxsize=256, ttl=600)
+
+
+# LEARN: A per-host cap on in-flight requests keeps our own bursts (prefetch, README
+# probes, parallel tool calls) below the point where SPI or GitHub answer 429 — the
+# costliest outcome, since the agent is told to wait a full minute. raw.githubusercontent.com
+# and api.github.com share one "github" budget: it is one provider's rate limit either way.
+# The GitHub default admits one fetch_readme's whole probe wave, so a single lookup
+# never waits on a second wave.
+_SPI_HOST = "spi"
+_GITHUB_HOST = "github"
+_README_FILENAMES = ("README.md", "README.rst", "README.txt", "README", "readme.md")
+_README_BRANCHES = ("main", "master")
+_HOST_CONCURRENCY = {
+    _SPI_HOST: ("SPM_SPI_CONCURRENCY", 4),
+    _GITHUB_HOST: ("SPM_GITHUB_CONCURRENCY", len(_README_FILENAMES) * len(_README_BRANCHES)),
+}
+_host_slots: dict[str, asyncio.Semaphore] = {}
+
+
+# LEARN: After 5 consecutive failures (timeouts, 429s, 5xx) a host gets 30 seconds of
+# fail-fast responses instead of more requests piling onto an upstream that is down.
+_breakers = {
+    _SPI_HOST: CircuitBreaker(failure_threshold=5, reset_timeout=30),
+    _GITHUB_HOST: CircuitBreaker(failure_threshold=5, reset_timeout=30),
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to default."""
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        logger.warning("Ignoring %s=%r: not an integer", name, raw)
+        return default
+    return max(value, 1)
+
+
+def _slots_for(host: str) -> asyncio.Semaphore:
+    """Return the semaphore limiting concurrent requests to host (_SPI_HOST or _GITHUB_HOST)."""
+    slots = _host_slots.get(host)
+    if slots is None:
+        name, default = _HOST_CONCURRENCY[host]
+        slots = _host_slots[host] = asyncio.Semaphore(_env_int(name, default))
+    return slots
+
+
+async def close_clients() -> None:
+    """Close the shared HTTP clients. Called from the server lifespan on shutdown.
+
+    Loop-bound semaphores are dropped too, so a later event loop gets fresh ones.
+    """
+    global _clients_lock, _parse_slots  # noqa: PLW0603 — reset alongside the per-host slots
+    clients = list(_clients.values())
+    _clients.clear()
+    _host_slots.clear()
+    _pending_searches.clear()
+    _clients_lock = None
+    _parse_slots = None
+    for client in clients:
+        await client.aclose()
+
+
+# Filter keys SPI understands. Keys typed into free text are matched case-insensitively.
+_FILTER_KEYS = frozenset({"author", "keyword", "stars", "platform", "license", "last_activity", "last_commit", "product"})
+
+
+def _canonicalize(parts: list[str]) -> str:
+    """Join query parts into one canonical SPI query string.
+
+    Collapses whitespace, lowercases known filter keys (``Author:apple`` becomes
+    ``author:apple``) and drops repeated tokens, keeping the first occurrence.
+    """
+    tokens: list[str] = []
+    for token in " ".join(parts).split():
+        key, sep, value = token.partition(":")
+        tokens.append(f"{key.lower()}:{value}" if sep and key.lower() in _FILTER_KEYS else token)
+    # LEARN: dict.fromkeys() dedupes while preserving order — a set would scramble the tokens.
+    return " ".join(dict.fromkeys(tokens))
+
+
+# (build_query parameter, SPI filter template) in the order filters appear in the query.
+_QUERY_FIELDS: tuple[tuple[str, str], ...] = (
+    ("author", "author:{}"),
+    ("keyword", "keyword:{}"),
+    ("min_stars", "stars:>={}"),
+    ("max_stars", "stars:<={}"),
+    ("platforms", "platform:{}"),
+    ("license_filter", "license:{}"),
+    ("last_activity_after", "last_activity:>={}"),
+    ("last_activity_before", "last_activity:<={}"),
+    ("last_commit_after", "last_commit:>={}"),
+    ("last_commit_before", "last_commit:<={}"),
+    ("product_type", "product:{}"),
+)
+
 
 def build_query(  # noqa: PLR0913
     query: str = "",
@@ -45,103 +199,109 @@ def build_query(  # noqa: PLR0913
     """Assemble structured parameters into SPI's query filter syntax.
 
     This is the core value-add: agents pass typed params, we build the DSL string.
+    The result is canonical, so equivalent filter sets (different key casing,
+    platform order, repeated tokens or spacing) produce the same string — and
+    therefore share one cache entry and one upstream fetch.
     """
+    # LEARN: Platforms are the only multi-value filter. SPI expects them comma-separated
+    # (platform:ios,linux); sorted and deduped so [ios, linux] and [linux, ios, ios] match.
+    values: dict[str, object] = {
+        "author": author,
+        "keyword": keyword,
+        "min_stars": min_stars,
+        "max_stars": max_stars,
+        "platforms": ",".join(sorted({p.value for p in platforms})) if platforms else None,
+        "license_filter": license_filter,
+        "last_activity_after": last_activity_after,
+        "last_activity_before": last_activity_before,
+        "last_commit_after": last_commit_after,
+        "last_commit_before": last_commit_before,
+        "product_type": product_type.value if product_type else None,
+    }
     # LEARN: We build a list of parts and join them — cleaner than string concatenation
-    # and avoids issues with leading/trailing spaces.
-    parts: list[str] = []
-
-    if query:
-        parts.append(query)
-
-    if author:
-        parts.append(f"author:{author}")
-
-    if keyword:
-        parts.append(f"keyword:{keyword}")
-
-    if min_stars is not None:
-        parts.append(f"stars:>={min_stars}")
-
-    if max_stars is not None:
-        parts.append(f"stars:<={max_stars}")
-
-    if platforms:
-        # LEARN: SPI expects comma-separated platforms: platform:ios,linux
-        platform_str = ",".join(p.value for p in platforms)
-        parts.append(f"platform:{platform_str}")
+    # and avoids issues with leading/trailing spaces. Empty strings are skipped, but a
+    # star bound of 0 is a real filter, so only None and "" count as "not given".
+    parts = [query] if query else []
+    parts.extend(template.format(value) for name, template in _QUERY_FIELDS if (value := values[name]) not in {None, ""})
+    return _canonicalize(parts)
 
-    if license_filter:
-        parts.append(f"license:{license_filter}")
 
-    if last_activity_after:
-        parts.append(f"last_activity:>={last_activity_after}")
+def _search_params(query_string: str, page: int = 1) -> dict[str, str | int]:
+    """Query parameters for one SPI search page (page 1 is SPI's default and is omitted)."""
+    if page > 1:
+        return {"query": query_string, "page": page}
+    return {"query": query_string}
 
-    if last_activity_before:
-        parts.append(f"last_activity:<={last_activity_before}")
 
-    if last_commit_after:
-        parts.append(f"last_commit:>={last_commit_after}")
+# LEARN: Agents page through and repeat the same searches, and the arguments are plain
+# strings and ints, so repeat calls skip httpx's URL parsing and percent-encoding.
+@functools.lru_cache(maxsize=1024)
+def _build_search_url(query_string: str, page: int = 1) -> str:
+    """Build the full SPI search URL with query and page parameters."""
+    # LEARN: httpx encodes params exactly as it does when sending the request, so the
+    # URL shown to the agent always matches the one that was fetched.
+    return str(httpx.URL(SPI_SEARCH_URL, params=_search_params(query_string, page)))
 
-    if last_commit_before:
-        parts.append(f"last_commit:<={last_commit_before}")
 
-    if product_type:
-        parts.append(f"product:{product_type.value}")
+# LEARN: Handle comma-separated thousands (e.g. "42,352 stars"). The lookarounds keep the
+# match to a whole whitespace-delimited word, so "1.5k" is rejected rather than read as 1.
+_STARS_RE = re.compile(r"(?<!\S)\d[\d,]*(?!\S)")
 
-    return " ".join(parts)
 
-
-def _build_search_url(query_string: str, page: int = 1) -> str:
-    """Build the full SPI search URL with query and page parameters."""
-    url = f"{SPI_SEARCH_URL}?query={quote_plus(query_string)}"
-    if page > 1:
-        url += f"&page={page}"
-    return url
+def _parse_stars(meta_li: LexborNode) -> int | None:
+    """Read the star count from a stars <li>, preferring its <small> label."""
+    small = meta_li.css_first("small")
+    match = _STARS_RE.search((small if small is not None else meta_li).text(strip=True))
+    return int(match.group().replace(",", "")) if match else None
 
 
-def _extract_metadata(link: Tag) -> tuple[int | None, str | None, bool]:
+def _extract_metadata(link: LexborNode) -> tuple[int | None, str | None, bool]:
     """Extract stars, last_activity, has_docs from a result's <ul class='metadata'>."""
     stars = None
     last_activity = None
     has_docs = False
-    metadata_ul = link.find("ul", class_="metadata")
-    if not isinstance(metadata_ul, Tag):
+    metadata_ul = link.css_first("ul.metadata")
+    if metadata_ul is None:
         return stars, last_activity, has_docs
 
-    for meta_li in metadata_ul.find_all("li", recursive=False):
-        if not isinstance(meta_li, Tag):
+    # LEARN: iter() yields direct element children only — the equivalent of
+    # BeautifulSoup's find_all(recursive=False).
+    for meta_li in metadata_ul.iter():
+        if meta_li.tag != "li":
             continue
-        classes = meta_li.get("class") or []
-        text = meta_li.get_text(strip=True)
-
-        if isinstance(classes, list) and "stars" in classes:
-            # LEARN: Handle comma-separated thousands (e.g. "42,352 stars")
-            for word in text.replace(",", "").split():
-                if word.isdigit():
-                    stars = int(word)
-                    break
-        elif isinstance(classes, list) and "activity" in classes:
-            last_activity = text
-        elif isinstance(classes, list) and "has_docs" in classes:
+
+        # LEARN: node.attributes builds a fresh dict on every access, so read the class
+        # list once per <li> instead of once per class we test for.
+        classes = (meta_li.attributes.get("class") or "").split()
+        if "stars" in classes:
+            stars = _parse_stars(meta_li)
+        elif "activity" in classes:
+            last_activity = meta_li.text(strip=True)
+        elif "has_docs" in classes:
             has_docs = True
 
     return stars, last_activity, has_docs
 
 
-def _extract_keywords(link: Tag) -> list[str]:
+# SPI prefixes the keyword list with a "Matching keywords:" label item; IGNORECASE avoids
+# allocating a lowercased copy of every keyword just to test the prefix.
+_KEYWORD_LABEL_RE = re.compile(r"matching keyword", re.IGNORECASE)
+
+
+def _extract_keywords(link: LexborNode) -> list[str]:
     """Extract matching keywords from a result's <ul class='keywords'>."""
     keywords: list[str] = []
-    kw_ul = link.find("ul", class_="keywords")
-    if not isinstance(kw_ul, Tag):
+    kw_ul = link.css_first("ul.keywords")
+    if kw_ul is None:
         return keywords
-    for kw_li in kw_ul.find_all("li"):
-        kw_text = kw_li.get_text(strip=True)
-        if kw_text and not kw_text.lower().startswith("matching keyword"):
+    for kw_li in kw_ul.css("li"):
+        kw_text = kw_li.text(strip=True)
+        if kw_text and not _KEYWORD_LABEL_RE.match(kw_text):
             keywords.append(kw_text)
     return keywords
 
 
-def _parse_package_from_li(li: Tag) -> PackageResult | None:
+def _parse_package_from_li(li: LexborNode) -> PackageResult | None:
     """Parse a single <li> search result element into a PackageResult.
 
     Returns None if the element can't be parsed (GRACEFUL_DEGRADATION pattern).
@@ -164,25 +324,27 @@ def _parse_package_from_li(li: Tag) -> PackageResult | None:
     """
     try:
         # LEARN: SPI wraps the entire result in a single <a> tag (not classed)
-        link = li.find("a")
-        if not isinstance(link, Tag):
+        # LEARN: css_first searches all descendants, like BeautifulSoup's find(), so an
+        # extra wrapper element in SPI's markup never drops a result or its fields.
+        link = li.css_first("a")
+        if link is None:
             return None
 
-        raw_href = link.get("href", "")
-        href = (raw_href[0] if raw_href else "") if isinstance(raw_href, list) else str(raw_href or "")
-
+        href = link.attributes.get("href") or ""
         path_parts = href.strip("/").split("/")
         if len(path_parts) < 2:  # noqa: PLR2004
             return None
 
         author, repo = path_parts[0], path_parts[1]
-        name_el = link.find("h4")
-        desc_el = link.find("p")
+        name_el = link.css_first("h4")
+        desc_el = link.css_first("p")
         stars, last_activity, has_docs = _extract_metadata(link)
 
-        return PackageResult(
-            name=name_el.get_text(strip=True) if isinstance(name_el, Tag) else repo,
-            description=desc_el.get_text(strip=True) if isinstance(desc_el, Tag) else "",
+        # LEARN: model_construct skips pydantic validation — every field here is already
+        # built with the right type, and validating each row is pure overhead on large pages.
+        return PackageResult.model_construct(
+            name=name_el.text(strip=True) if name_el is not None else repo,
+            description=desc_el.text(strip=True) if desc_el is not None else "",
             url=urljoin(SPI_BASE_URL, href),
             github_url=f"https://github.com/{author}/{repo}",
             author=author,
@@ -196,35 +358,26 @@ def _parse_package_from_li(li: Tag) -> PackageResult | None:
         return None
 
 
-def parse_search_results(html: str) -> list[PackageResult]:
-    """Parse SPI search results HTML into a list of PackageResult models.
-
-    Uses GRACEFUL_DEGRADATION: if individual results fail to parse,
-    we skip them and return what we can.
-    """
-    soup = BeautifulSoup(html, "lxml")
+def _extract_results(tree: LexborHTMLParser) -> list[PackageResult]:
+    """Extract PackageResult models from an already-parsed SPI search page."""
     results: list[PackageResult] = []
 
     # LEARN: SPI nests results in: section.package-results > ul (classless)
     # The section also contains a <ul class="filter-list"> and <ul class="pagination">,
-    # so we find the <ul> that has NO class attribute — that's the results list.
-    package_section = soup.find("section", class_="package-results")
-    if not isinstance(package_section, Tag):
-        logger.warning("Could not find section.package-results in HTML — SPI may have changed their markup")
-        return results
-
-    package_list = None
-    for ul in package_section.find_all("ul", recursive=False):
-        if not ul.get("class"):
-            package_list = ul
-            break
-
-    if not isinstance(package_list, Tag):
-        logger.warning("Could not find classless <ul> inside package-results — SPI may have changed their markup")
+    # so we want the <ul> that has NO class attribute — that's the results list. An empty
+    # class="" counts as classless too. One selector list lets lexbor do the whole lookup
+    # in C instead of a Python walk, and it returns the first match in document order.
+    package_list = tree.css_first('section.package-results > ul:not([class]), section.package-results > ul[class=""]')
+    if package_list is None:
+        # Only the failure path pays for a second lookup, to say which part went missing.
+        if tree.css_first("section.package-results") is None:
+            logger.warning("Could not find section.package-results in HTML — SPI may have changed their markup")
+        else:
+            logger.warning("Could not find classless <ul> inside package-results — SPI may have changed their markup")
         return results
 
-    for li in package_list.find_all("li", recursive=False):
-        if isinstance(li, Tag):
+    for li in package_list.iter():
+        if li.tag == "li":
             result = _parse_package_from_li(li)
             if result is not None:
                 results.append(result)
@@ -232,16 +385,54 @@ def parse_search_results(html: str) -> list[PackageResult]:
     return results
 
 
-def _has_more_pages(html: str) -> bool:
-    """Check if there's a 'next' pagination link in the HTML."""
-    soup = BeautifulSoup(html, "lxml")
+def _has_next_page(tree: LexborHTMLParser) -> bool:
+    """Check an already-parsed SPI search page for a 'next' pagination link."""
     # LEARN: SPI uses <ul class="pagination"> with <li class="next"> containing the next-page link.
-    pagination = soup.find("ul", class_="pagination")
-    if isinstance(pagination, Tag):
-        next_li = pagination.find("li", class_="next")
-        if isinstance(next_li, Tag) and next_li.find("a"):
-            return True
-    return False
+    return tree.css_first("ul.pagination li.next a") is not None
+
+
+def parse_search_results(html: str | bytes) -> list[PackageResult]:
+    """Parse SPI search results HTML into a list of PackageResult models.
+
+    Uses GRACEFUL_DEGRADATION: if individual results fail to parse,
+    we skip them and return what we can.
+    """
+    return _extract_results(LexborHTMLParser(html))
+
+
+def _has_more_pages(html: str | bytes) -> bool:
+    """Check if there's a 'next' pagination link in the HTML."""
+    return _has_next_page(LexborHTMLParser(html))
+
+
+def _parse_search_html(html: str | bytes) -> tuple[list[PackageResult], bool]:
+    """Parse results and the has-more flag from a single tree build.
+
+    search_packages needs both, so building the tree once halves the parse work.
+    """
+    tree = LexborHTMLParser(html)
+    return _extract_results(tree), _has_next_page(tree)
+
+
+# LEARN: Parsing a large results page is CPU work that would otherwise stall every other
+# tool call on the event loop. A few worker threads are plenty; the semaphore keeps a
+# burst of parallel searches from queueing dozens of parse jobs on the default executor.
+_PARSE_CONCURRENCY = 4
+_parse_slots: asyncio.Semaphore | None = None
+
+
+def _get_parse_slots() -> asyncio.Semaphore:
+    """Return the parse semaphore, created lazily so it belongs to the running loop."""
+    global _parse_slots  # noqa: PLW0603 — lazily created like the per-host slots
+    if _parse_slots is None:
+        _parse_slots = asyncio.Semaphore(_PARSE_CONCURRENCY)
+    return _parse_slots
+
+
+async def _parse_search_html_in_thread(html: str | bytes) -> tuple[list[PackageResult], bool]:
+    """Run _parse_search_html in a worker thread so the event loop stays responsive."""
+    async with _get_parse_slots():
+        return await asyncio.to_thread(_parse_search_html, html)
 
 
 def _error_response(query: str, page: int, search_url: str, *, next_step: str) -> SearchResponse:
@@ -250,7 +441,7 @@ def _error_response(query: str, page: int, search_url: str, *, next_step: str) -
     Returns a valid SearchResponse with zero results and an actionable next_step,
     so the agent always gets structured data — never a raw exception.
     """
-    return SearchResponse(
+    return SearchResponse.model_construct(
         query=query,
         results=[],
         result_count=0,
@@ -261,29 +452,152 @@ def _error_response(query: str, page: int, search_url: str, *, next_step: str) -
     )
 
 
-def _classify_http_error(status_code: int) -> str:
+def _empty_query_response(page: int) -> SearchResponse:
+    """Guide the agent to supply a query or filter instead of searching for nothing."""
+    return SearchResponse.model_construct(
+        query="",
+        results=[],
+        result_count=0,
+        page=page,
+        has_more=False,
+        spi_search_url=SPI_SEARCH_URL,
+        next_step="Provide a search query or at least one filter (e.g. author, keyword, min_stars).",
+    )
+
+
+# LEARN: Statuses with a fixed message are a plain dict lookup. Everything else is formatted
+# once per status code and memoised — a struggling upstream tends to repeat the same code.
+_HTTP_ERROR_MESSAGES: dict[int, str] = {
+    429: "RETRYABLE: Rate limited by Swift Package Index. Wait 60 seconds, then retry the same search.",
+    403: "PERMANENT: Access denied by Swift Package Index (403). The site may be blocking automated requests.",
+    404: "PERMANENT: Search endpoint not found (404). SPI may have changed their URL structure.",
+}
+
+
+def _classify_http_error(status_code: int, *, retry_after: int | None = None) -> str:
     """Classify an HTTP status code into an agent-friendly recovery message.
 
     LEARN: The RECOVERY_GUIDE pattern means every error answers three questions:
     (1) what went wrong, (2) why, (3) how to fix it. We prefix with RETRYABLE
     or PERMANENT so the agent knows whether to retry or change its approach.
     """
-    # LEARN: Match statement (Python 3.10+) is cleaner than if/elif chains for
-    # mapping discrete values to outcomes.
-    match status_code:
-        case 429:
-            return "RETRYABLE: Rate limited by Swift Package Index. Wait 60 seconds, then retry the same search."
-        case 403:
-            return "PERMANENT: Access denied by Swift Package Index (403). The site may be blocking automated requests."
-        case 404:
-            return "PERMANENT: Search endpoint not found (404). SPI may have changed their URL structure."
-        case s if 500 <= s < 600:  # noqa: PLR2004
-            return f"RETRYABLE: Swift Package Index returned server error ({s}). The site may be under maintenance. Retry in 30 seconds."
-        case _:
-            return f"PERMANENT: Unexpected HTTP {status_code} from Swift Package Index. Check {SPI_BASE_URL} manually."
-
-
-async def search_packages(  # noqa: PLR0913
+    if status_code == 429 and retry_after is not None:  # noqa: PLR2004
+        return f"RETRYABLE: Rate limited by Swift Package Index. Wait {retry_after} seconds, then retry the same search."
+    return _HTTP_ERROR_MESSAGES.get(status_code) or _classify_other_status(status_code)
+
+
+@functools.lru_cache(maxsize=64)
+def _classify_other_status(status_code: int) -> str:
+    """Build the message for statuses without a fixed entry in _HTTP_ERROR_MESSAGES."""
+    if 500 <= status_code < 600:  # noqa: PLR2004
+        return (
+            f"RETRYABLE: Swift Package Index returned server error ({status_code}). The site may be under maintenance. Retry in 30 seconds."
+        )
+    return f"PERMANENT: Unexpected HTTP {status_code} from Swift Package Index. Check {SPI_BASE_URL} manually."
+
+
+def _retry_after_seconds(response: httpx.Response) -> int | None:
+    """Read a delta-seconds Retry-After header; the rarer HTTP-date form is ignored."""
+    value = response.headers.get("Retry-After", "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def _is_upstream_failure(status_code: int) -> bool:
+    """Statuses that mean the upstream is overloaded or broken, as opposed to our request."""
+    return status_code == 429 or status_code >= 500  # noqa: PLR2004
+
+
+# LEARN: The TTL cache only helps once a fetch has finished. If the agent asks for a page
+# while its prefetch is still in flight, both callers share the pending task instead of
+# sending SPI the same request twice.
+_pending_searches: dict[tuple[str, int], asyncio.Task[bytes]] = {}
+
+
+async def _fetch_search_html(query_string: str, page: int) -> bytes:
+    """Fetch one SPI search results page, serving repeats from the TTL cache.
+
+    Concurrent requests for the same page share one upstream fetch. Error statuses
+    raise httpx.HTTPStatusError so they never reach the cache; while SPI's circuit
+    breaker is open, CircuitOpenError is raised without a request.
+    """
+    cache_key = (query_string, page)
+    html = _search_cache.get(cache_key)
+    if html is not None:
+        return html
+
+    task = _pending_searches.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_download_search_html(query_string, page))
+        _pending_searches[cache_key] = task
+        task.add_done_callback(functools.partial(_forget_pending_search, cache_key))
+    # shield: one caller giving up must not cancel the fetch the others are waiting on.
+    return await asyncio.shield(task)
+
+
+def _forget_pending_search(cache_key: tuple[str, int], task: asyncio.Task[bytes]) -> None:
+    """Drop a finished fetch from the pending table, marking its exception as retrieved."""
+    if _pending_searches.get(cache_key) is task:
+        del _pending_searches[cache_key]
+    if not task.cancelled():
+        # Every waiter may have been cancelled already; don't log the error as unretrieved.
+        task.exception()
+
+
+async def _download_search_html(query_string: str, page: int) -> bytes:
+    """Send one SPI search request and cache a successful body (see _fetch_search_html)."""
+    cache_key = (query_string, page)
+    breaker = _breakers[_SPI_HOST]
+    if not breaker.allow():
+        raise CircuitOpenError(breaker.retry_after)
+
+    client = await _get_client(SPI_BASE_URL)
+    try:
+        async with _slots_for(_SPI_HOST):
+            response = await client.get(SPI_SEARCH_URL, params=_search_params(query_string, page))
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    logger.debug("SPI search page %d answered over %s", page, response.http_version)
+    if _is_upstream_failure(response.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if response.status_code >= 400:  # noqa: PLR2004
+        msg = f"HTTP {response.status_code} from Swift Package Index"
+        raise httpx.HTTPStatusError(msg, request=response.request, response=response)
+
+    # LEARN: Lexbor parses raw bytes (sniffing the charset itself), so keeping the body as
+    # bytes skips decoding the whole page into a str that would only be re-encoded.
+    _search_cache.set(cache_key, response.content)
+    return response.content
+
+
+# LEARN: asyncio only keeps weak references to tasks, so fire-and-forget tasks must be
+# held somewhere or they can be garbage-collected mid-flight.
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+def _prefetch_enabled() -> bool:
+    """Next-page prefetch is opt-in (SPM_PREFETCH=1) to keep default traffic to SPI polite."""
+    return os.environ.get("SPM_PREFETCH") == "1"
+
+
+async def _prefetch_search_page(query_string: str, page: int) -> None:
+    """Warm the search cache with a page the agent is likely to request next."""
+    try:
+        await _fetch_search_html(query_string, page)
+    except Exception:
+        logger.warning("Prefetch of page %d for %r failed", page, query_string, exc_info=True)
+
+
+def _schedule_prefetch(query_string: str, page: int) -> None:
+    """Start a background prefetch without making the current tool call wait for it."""
+    task = asyncio.create_task(_prefetch_search_page(query_string, page))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def search_packages(  # noqa: PLR0911, PLR0913
     query: str = "",
     *,
     author: str | None = None,
@@ -300,6 +614,26 @@ async def search_packages(  # noqa: PLR0913
     page: int = 1,
 ) -> SearchResponse:
     """Execute a search against the Swift Package Index and return structured results."""
+    # LEARN: Agents sometimes probe with no arguments at all. Answer that before doing
+    # any query building; star bounds are checked against None because 0 is a real filter.
+    no_filters = (
+        min_stars is None
+        and max_stars is None
+        and not any((
+            author,
+            keyword,
+            platforms,
+            license_filter,
+            last_activity_after,
+            last_activity_before,
+            last_commit_after,
+            last_commit_before,
+            product_type,
+        ))
+    )
+    if no_filters and not query.strip():
+        return _empty_query_response(page)
+
     query_string = build_query(
         query,
         author=author,
@@ -315,16 +649,8 @@ async def search_packages(  # noqa: PLR0913
         product_type=product_type,
     )
 
-    if not query_string.strip():
-        return SearchResponse(
-            query="",
-            results=[],
-            result_count=0,
-            page=page,
-            has_more=False,
-            spi_search_url=SPI_SEARCH_URL,
-            next_step="Provide a search query or at least one filter (e.g. author, keyword, min_stars).",
-        )
+    if not query_string:
+        return _empty_query_response(page)
 
     search_url = _build_search_url(query_string, page)
 
@@ -332,8 +658,7 @@ async def search_packages(  # noqa: PLR0913
     # agent-friendly SearchResponse objects instead of letting raw tracebacks propagate.
     # This means the agent ALWAYS gets structured data back, even on failure.
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            response = await client.get(search_url)
+        html = await _fetch_search_html(query_string, page)
     except httpx.TimeoutException:
         return _error_response(
             query_string,
@@ -348,18 +673,27 @@ async def search_packages(  # noqa: PLR0913
             search_url,
             next_step="RETRYABLE: Could not reach swiftpackageindex.com. Check connectivity or retry in 30 seconds.",
         )
-
-    if response.status_code >= 400:  # noqa: PLR2004
+    except httpx.HTTPStatusError as exc:
+        return _error_response(
+            query_string,
+            page,
+            search_url,
+            next_step=_classify_http_error(exc.response.status_code, retry_after=_retry_after_seconds(exc.response)),
+        )
+    except CircuitOpenError as exc:
         return _error_response(
             query_string,
             page,
             search_url,
-            next_step=_classify_http_error(response.status_code),
+            next_step=(
+                "RETRYABLE: Swift Package Index has failed several requests in a row, so searches are paused. "
+                f"Retry in {math.ceil(exc.retry_after)} seconds."
+            ),
         )
 
-    html = response.text
-    results = parse_search_results(html)
-    has_more = _has_more_pages(html)
+    results, has_more = await _parse_search_html_in_thread(html)
+    if has_more and _prefetch_enabled():
+        _schedule_prefetch(query_string, page + 1)
 
     # Build next-action hint (NEXT_ACTION_HINT pattern)
     if results:
@@ -371,7 +705,7 @@ async def search_packages(  # noqa: PLR0913
     else:
         next_step = "No results found. Try broadening your search — remove filters or use different keywords."
 
-    return SearchResponse(
+    return SearchResponse.model_construct(
         query=query_string,
         results=results,
         result_count=len(results),
@@ -390,33 +724,134 @@ def _truncate_readme(content: str, max_length: int) -> str:
     return content
 
 
+async def _probe_readme(client: httpx.AsyncClient, url: str, *, download: bool = False) -> httpx.Response:
+    """HEAD a README candidate (or GET it when download is set), falling back to GET if HEAD is refused."""
+    # LEARN: Most candidates 404. A HEAD answers "does this file exist?" without
+    # transferring a body, so lower-priority candidates are only downloaded if they win.
+    async with _slots_for(_GITHUB_HOST):
+        if download:
+            return await client.get(url)
+        response = await client.head(url)
+        if response.status_code == 405:  # noqa: PLR2004
+            response = await client.get(url)
+    return response
+
+
+async def _first_decisive_response(client: httpx.AsyncClient, urls: list[str]) -> httpx.Response | None:
+    """Probe every candidate at once and return the highest-priority 200 or 429, if any.
+
+    Responses are awaited in priority order, so a README.md on main still wins over a
+    README on master that happened to answer first. The top candidate is fetched with
+    GET rather than HEAD, so the common case (README.md on main) returns its body in
+    the same round-trip as the probes.
+    """
+    tasks = [asyncio.create_task(_probe_readme(client, url, download=i == 0)) for i, url in enumerate(urls)]
+    try:
+        for task in tasks:
+            response = await task
+            if response.status_code in {200, 429}:
+                return response
+        return None
+    finally:
+        # LEARN: Cancel the losers and wait for them so no task outlives the call
+        # or leaves an unretrieved exception behind.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _github_token() -> str | None:
+    """Token for the GitHub REST API, if the user configured one."""
+    return os.environ.get("SPM_GITHUB_TOKEN") or None
+
+
+async def _fetch_readme_from_api(owner: str, repo: str, token: str) -> httpx.Response:
+    """Ask the GitHub REST API for the repository's README on its default branch."""
+    client = await _get_client(GITHUB_API_URL)
+    async with _slots_for(_GITHUB_HOST):
+        return await client.get(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/readme",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+
+async def _probe_raw_readme(owner: str, repo: str) -> httpx.Response | None:
+    """Find the README on raw.githubusercontent.com by probing the common names on main and master."""
+    # LEARN: raw.githubusercontent.com serves raw file content without GitHub's HTML wrapper.
+    # We try common README filenames in order of likelihood.
+    urls = [f"{GITHUB_RAW_URL}/{owner}/{repo}/{branch}/{filename}" for branch in _README_BRANCHES for filename in _README_FILENAMES]
+
+    client = await _get_client(GITHUB_RAW_URL)
+    response = await _first_decisive_response(client, urls)
+    if response is not None and response.status_code == 200 and response.request.method == "HEAD":  # noqa: PLR2004
+        # A lower-priority HEAD won: it only proved the file exists, so download its body.
+        async with _slots_for(_GITHUB_HOST):
+            response = await client.get(response.request.url)
+    return response
+
+
+def _is_rate_limited(response: httpx.Response) -> bool:
+    """GitHub signals an exhausted API quota with 403 and X-RateLimit-Remaining: 0, not only 429."""
+    if response.status_code == 429:  # noqa: PLR2004
+        return True
+    return response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"  # noqa: PLR2004
+
+
+def _readme_failure_message(owner: str, repo: str, response: httpx.Response | None) -> str:
+    """Recovery guidance for a README lookup that did not produce content (RECOVERY_GUIDE pattern)."""
+    if response is not None and _is_rate_limited(response):
+        wait = _retry_after_seconds(response) or 60
+        return f"RETRYABLE: GitHub rate limited the request for {owner}/{repo}. Wait {wait} seconds, then retry."
+    if response is not None and response.status_code == 401:  # noqa: PLR2004
+        return f"PERMANENT: GitHub rejected SPM_GITHUB_TOKEN while fetching {owner}/{repo}. Fix or unset the token."
+    if response is not None and response.status_code >= 500:  # noqa: PLR2004
+        return f"RETRYABLE: GitHub returned {response.status_code} for {owner}/{repo}. Retry in 30 seconds."
+    return (
+        f"README not found for {owner}/{repo}. The repository may be private, archived, "
+        f"or use a non-standard default branch. Check https://github.com/{owner}/{repo} manually."
+    )
+
+
 async def fetch_readme(owner: str, repo: str, *, max_length: int = 4000) -> str:
-    """Fetch a package's README from GitHub raw content.
+    """Fetch a package's README from GitHub.
 
     SPI detail pages return 403 for scrapers, so we go to GitHub directly.
     Returns truncated content by default (TOKEN_EFFICIENT_RESPONSE pattern).
     """
-    # LEARN: raw.githubusercontent.com serves raw file content without GitHub's HTML wrapper.
-    # We try common README filenames in order of likelihood.
-    filenames = ["README.md", "README.rst", "README.txt", "README", "readme.md"]
-    branches = ["main", "master"]
+    # GitHub owner/repo names are case-insensitive, so the cache key is too.
+    cache_key = (owner.lower(), repo.lower())
+    cached = _readme_cache.get(cache_key)
+    if cached is not None:
+        return _truncate_readme(cached, max_length)
+
+    breaker = _breakers[_GITHUB_HOST]
+    if not breaker.allow():
+        return (
+            f"RETRYABLE: GitHub has failed several requests in a row, so README fetches are paused. "
+            f"Retry {owner}/{repo} in {math.ceil(breaker.retry_after)} seconds."
+        )
 
     try:
-        async with httpx.AsyncClient(headers=GITHUB_HEADERS, timeout=15.0, follow_redirects=True) as client:
-            for branch in branches:
-                for filename in filenames:
-                    url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{filename}"
-                    response = await client.get(url)
-                    if response.status_code == 200:  # noqa: PLR2004
-                        return _truncate_readme(response.text, max_length)
-                    if response.status_code == 429:  # noqa: PLR2004
-                        return f"RETRYABLE: GitHub rate limited the request for {owner}/{repo}. Wait 60 seconds, then retry."
+        # LEARN: With a token, the REST readme endpoint finds the file on the default branch
+        # in one request (5000 requests/hour). Without one the API allows only 60 requests
+        # an hour, so anonymous users keep the unmetered raw.githubusercontent.com probe.
+        if token := _github_token():
+            response = await _fetch_readme_from_api(owner, repo, token)
+        else:
+            response = await _probe_raw_readme(owner, repo)
     except httpx.TimeoutException:
+        breaker.record_failure()
         return f"RETRYABLE: GitHub took too long to respond for {owner}/{repo}. Retry the same request."
     except httpx.TransportError:
+        breaker.record_failure()
         return f"RETRYABLE: Could not connect to GitHub for {owner}/{repo}. Retry in 30 seconds."
 
-    return (
-        f"README not found for {owner}/{repo}. The repository may be private, archived, "
-        f"or use a non-standard default branch. Check https://github.com/{owner}/{repo} manually."
-    )
+    if response is not None and response.status_code == 200:  # noqa: PLR2004
+        breaker.record_success()
+        _readme_cache.set(cache_key, response.text)
+        return _truncate_readme(response.text, max_length)
+    if response is not None and (_is_upstream_failure(response.status_code) or _is_rate_limited(response)):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return _readme_failure_message(owner, repo, response)
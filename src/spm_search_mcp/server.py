@@ -14,14 +14,29 @@ Applies arcade patterns throughout:
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING, Any
 
 from fastmcp import FastMCP
+from fastmcp.server.lifespan import lifespan
 
 from spm_search_mcp.models import Platform, ProductType, SearchResponse
-from spm_search_mcp.scraper import fetch_readme, search_packages
+from spm_search_mcp.scraper import close_clients, fetch_readme, search_packages
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 logger = logging.getLogger(__name__)
 
+
+@lifespan
+async def http_lifespan(_server: FastMCP[Any]) -> AsyncIterator[dict[str, Any]]:
+    """Close the scraper's pooled HTTP clients when the server shuts down."""
+    try:
+        yield {}
+    finally:
+        await close_clients()
+
+
 # LEARN: FastMCP() name appears in MCP client UIs (e.g. Claude Desktop sidebar).
 # instructions= is the "system prompt" sent to the agent describing the server's purpose.
 mcp = FastMCP(
@@ -33,6 +48,7 @@ mcp = FastMCP(
         "Use get_package_readme to fetch a package's README after finding it in search results. "
         "No API key required."
     ),
+    lifespan=http_lifespan,
 )
 
 
@@ -106,6 +122,13 @@ async def search_swift_packages(  # noqa: PLR0913, PLR0917
     )
 
 
+# LEARN: The enums never change at runtime, so the discovery payload is built once at import.
+_SEARCH_FILTERS: dict[str, list[str]] = {
+    "platforms": [p.value for p in Platform],
+    "product_types": [p.value for p in ProductType],
+}
+
+
 @mcp.tool
 def list_search_filters() -> dict[str, list[str]]:
     """Return all valid values for the constrained parameters of search_swift_packages.
@@ -116,10 +139,7 @@ def list_search_filters() -> dict[str, list[str]]:
     Returns a dict with keys 'platforms' and 'product_types', each containing
     the list of accepted string values.
     """
-    return {
-        "platforms": [p.value for p in Platform],
-        "product_types": [p.value for p in ProductType],
-    }
+    return _SEARCH_FILTERS
 
 
 @mcp.tool
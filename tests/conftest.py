@@ -0,0 +1,59 @@
+"""Shared pytest fixtures."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from spm_search_mcp import scraper
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+# LEARN: The code under test is asyncio-only (httpx, asyncio.to_thread), so pin anyio to
+# asyncio explicitly rather than relying on the plugin default. Session scope lets anyio
+# reuse one event loop runner for the whole run instead of starting one per module.
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    """Run every @pytest.mark.anyio test on asyncio only."""
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_caches():
+    """Start every test with empty scraper caches so responses never leak between tests.
+
+    Per-host semaphores are dropped and circuit breakers closed too, so no test
+    inherits another's waiters or failure streak.
+    """
+    scraper._search_cache.clear()
+    scraper._readme_cache.clear()
+    scraper._host_slots.clear()
+    scraper._pending_searches.clear()
+    scraper._parse_slots = None
+    for breaker in scraper._breakers.values():
+        breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def _no_github_token(monkeypatch: pytest.MonkeyPatch):
+    """Keep README tests on the raw.githubusercontent.com path even if the shell exports a token."""
+    monkeypatch.delenv("SPM_GITHUB_TOKEN", raising=False)
+
+
+# LEARN: Both search and README fetching go through scraper._get_client, so every test
+# module stubs that one seam. Each test installs its own fake through monkeypatch — no
+# module globals, so tests stay independent and safe to run in parallel workers.
+@pytest.fixture
+def install_fake_client(monkeypatch: pytest.MonkeyPatch) -> Callable[[Any], None]:
+    """Return a function that makes scraper._get_client hand back a fake for every host."""
+
+    def install(client: Any) -> None:
+        async def _fake_get_client(_base_url: str) -> Any:  # noqa: RUF029 — awaitable like the real helper
+            return client
+
+        monkeypatch.setattr(scraper, "_get_client", _fake_get_client)
+
+    return install
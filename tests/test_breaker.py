@@ -0,0 +1,73 @@
+"""Tests for the per-host circuit breaker."""
+
+from __future__ import annotations
+
+from spm_search_mcp import breaker
+from spm_search_mcp.breaker import BreakerState, CircuitBreaker
+
+
+class TestCircuitBreaker:
+    def test_stays_closed_below_threshold(self):
+        b = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        b.record_failure()
+        b.record_failure()
+        assert b.state is BreakerState.CLOSED
+        assert b.allow()
+
+    def test_success_resets_failure_streak(self):
+        b = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        b.record_failure()
+        b.record_success()
+        b.record_failure()
+        assert b.allow()
+
+    def test_opens_at_threshold(self, monkeypatch):
+        monkeypatch.setattr(breaker.time, "monotonic", lambda: 1000.0)
+        b = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        b.record_failure()
+        b.record_failure()
+        assert b.state is BreakerState.OPEN
+        assert not b.allow()
+        assert b.retry_after == 30
+
+    def test_half_open_after_cool_down(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(breaker.time, "monotonic", lambda: now)
+        b = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        b.record_failure()
+        now += 31
+        assert b.state is BreakerState.HALF_OPEN
+        assert b.allow()
+        b.record_success()
+        assert b.state is BreakerState.CLOSED
+
+    def test_failed_trial_reopens(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(breaker.time, "monotonic", lambda: now)
+        b = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        for _ in range(3):
+            b.record_failure()
+        now += 31
+        b.record_failure()
+        assert b.state is BreakerState.OPEN
+        assert b.retry_after == 30
+
+    def test_half_open_lets_one_trial_through(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(breaker.time, "monotonic", lambda: now)
+        b = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        b.record_failure()
+        now += 31
+        assert b.allow()
+        assert not b.allow()
+        assert b.retry_after == 30
+
+    def test_unrecorded_trial_expires(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(breaker.time, "monotonic", lambda: now)
+        b = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        b.record_failure()
+        now += 31
+        assert b.allow()
+        now += 31  # the trial's caller never reported back
+        assert b.allow()
@@ -0,0 +1,41 @@
+"""Tests for the in-process TTL + LRU response cache."""
+
+from __future__ import annotations
+
+from spm_search_mcp import cache
+from spm_search_mcp.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_missing_key_returns_none(self):
+        assert TTLCache[str, str](maxsize=2, ttl=60).get("nope") is None
+
+    def test_set_then_get(self):
+        c = TTLCache[str, str](maxsize=2, ttl=60)
+        c.set("a", "A")
+        assert c.get("a") == "A"
+
+    def test_entry_expires_after_ttl(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+        c = TTLCache[str, str](maxsize=2, ttl=60)
+        c.set("a", "A")
+        now += 61
+        assert c.get("a") is None
+        assert len(c) == 0
+
+    def test_least_recently_used_evicted(self):
+        c = TTLCache[str, str](maxsize=2, ttl=60)
+        c.set("a", "A")
+        c.set("b", "B")
+        c.get("a")  # touch "a" so "b" becomes least recently used
+        c.set("c", "C")
+        assert c.get("a") == "A"
+        assert c.get("b") is None
+        assert c.get("c") == "C"
+
+    def test_clear_drops_everything(self):
+        c = TTLCache[str, str](maxsize=2, ttl=60)
+        c.set("a", "A")
+        c.clear()
+        assert len(c) == 0
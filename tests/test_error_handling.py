@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import httpx
 import pytest
@@ -10,40 +10,35 @@ import pytest
 from spm_search_mcp import scraper
 from spm_search_mcp.scraper import _classify_http_error, _error_response
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 class TestClassifyHttpError:
     """Verify HTTP status codes map to correct RETRYABLE/PERMANENT classification."""
 
-    def test_429_is_retryable(self):
-        msg = _classify_http_error(429)
-        assert msg.startswith("RETRYABLE")
-        assert "rate limit" in msg.lower()
-
-    def test_403_is_permanent(self):
-        msg = _classify_http_error(403)
-        assert msg.startswith("PERMANENT")
-
-    def test_404_is_permanent(self):
-        msg = _classify_http_error(404)
-        assert msg.startswith("PERMANENT")
-
-    def test_500_is_retryable(self):
-        msg = _classify_http_error(500)
-        assert msg.startswith("RETRYABLE")
-        assert "500" in msg
-
-    def test_502_is_retryable(self):
-        msg = _classify_http_error(502)
-        assert msg.startswith("RETRYABLE")
-
-    def test_503_is_retryable(self):
-        msg = _classify_http_error(503)
+    @pytest.mark.parametrize(
+        ("status", "prefix", "detail"),
+        [
+            (429, "RETRYABLE", "rate limit"),
+            (403, "PERMANENT", None),
+            (404, "PERMANENT", None),
+            (500, "RETRYABLE", "500"),
+            (502, "RETRYABLE", None),
+            (503, "RETRYABLE", None),
+            (418, "PERMANENT", "418"),
+        ],
+    )
+    def test_classification(self, status: int, prefix: str, detail: str | None):
+        msg = _classify_http_error(status)
+        assert msg.startswith(prefix)
+        if detail is not None:
+            assert detail in msg.lower()
+
+    def test_retry_after_overrides_default_wait(self):
+        msg = _classify_http_error(429, retry_after=12)
         assert msg.startswith("RETRYABLE")
-
-    def test_unknown_status_is_permanent(self):
-        msg = _classify_http_error(418)
-        assert msg.startswith("PERMANENT")
-        assert "418" in msg
+        assert "Wait 12 seconds" in msg
 
 
 class TestErrorResponse:
@@ -68,37 +63,24 @@ class TestErrorResponse:
         assert resp.next_step == "RETRYABLE: do something"
 
 
-# LEARN: Both search and README fetching use httpx.AsyncClient, so tests share one factory.
-
-
-def _fake_httpx_factory(**_kwargs: Any) -> Any:
-    """Swallow httpx.AsyncClient kwargs."""
-    return _active_fake_httpx_client
-
-
-_active_fake_httpx_client: Any = None
-
-
 class _HttpxTimeoutClient:
-    async def __aenter__(self):
-        return self
+    expected_detail = "timed out"
 
-    async def __aexit__(self, *args):
-        pass
+    def __init__(self) -> None:
+        self.calls = 0
 
-    async def get(self, url):
+    async def get(self, url, **_kwargs):
+        self.calls += 1
         msg = "timed out"
         raise httpx.TimeoutException(msg)
 
+    head = get
 
-class _HttpxConnectErrorClient:
-    async def __aenter__(self):
-        return self
 
-    async def __aexit__(self, *args):
-        pass
+class _HttpxConnectErrorClient:
+    expected_detail = "Could not reach"
 
-    async def get(self, url):
+    async def get(self, url, **_kwargs):
         msg = "connection refused"
         raise httpx.ConnectError(msg)
 
@@ -106,75 +88,76 @@ class _HttpxConnectErrorClient:
 class _HttpxServerErrorClient:
     """Returns a response with status 503."""
 
-    async def __aenter__(self):
-        return self
+    expected_detail = "503"
 
-    async def __aexit__(self, *args):
-        pass
+    def __init__(self) -> None:
+        self.calls = 0
 
-    async def get(self, url):
+    async def get(self, url, **_kwargs):
         from unittest.mock import MagicMock
 
+        self.calls += 1
         resp = MagicMock()
         resp.status_code = 503
+        resp.headers = {}
         return resp
 
 
+@pytest.fixture(
+    params=[_HttpxTimeoutClient, _HttpxConnectErrorClient, _HttpxServerErrorClient],
+    ids=["timeout", "connect", "503"],
+)
+def failing_search_client(request: pytest.FixtureRequest, install_fake_client: Callable[[Any], None]) -> Any:
+    """Install one kind of failing SPI client for the duration of a test."""
+    client = request.param()
+    install_fake_client(client)
+    return client
+
+
 class TestSearchPackagesErrorHandling:
     """Verify search_packages catches HTTP errors and returns structured responses."""
 
     @pytest.mark.anyio
-    async def test_timeout_returns_retryable(self, monkeypatch):
-        """Simulate a timeout and verify the response is RETRYABLE."""
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _HttpxTimeoutClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+    async def test_failure_returns_retryable(self, failing_search_client: Any):
+        """Timeouts, connection failures and 503s all come back as RETRYABLE guidance."""
         resp = await scraper.search_packages("networking")
         assert resp.result_count == 0
         assert "RETRYABLE" in resp.next_step
+        assert failing_search_client.expected_detail in resp.next_step
 
     @pytest.mark.anyio
-    async def test_connect_error_returns_retryable(self, monkeypatch):
-        """Simulate a connection failure."""
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _HttpxConnectErrorClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+    async def test_repeated_failures_open_circuit(self, install_fake_client):
+        """After five upstream failures the sixth search fails fast without a request."""
+        client = _HttpxServerErrorClient()
+        install_fake_client(client)
+        for _ in range(5):
+            await scraper.search_packages("networking")
         resp = await scraper.search_packages("networking")
-        assert resp.result_count == 0
-        assert "RETRYABLE" in resp.next_step
-
-    @pytest.mark.anyio
-    async def test_503_returns_retryable(self, monkeypatch):
-        """Simulate a 503 server error."""
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _HttpxServerErrorClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
-        resp = await scraper.search_packages("networking")
-        assert resp.result_count == 0
-        assert "RETRYABLE" in resp.next_step
-        assert "503" in resp.next_step
+        assert client.calls == 5
+        assert resp.next_step.startswith("RETRYABLE")
+        assert "paused" in resp.next_step
 
 
 class TestFetchReadmeErrorHandling:
     """Verify fetch_readme catches HTTP errors and returns recovery messages."""
 
     @pytest.mark.anyio
-    async def test_timeout_returns_retryable(self, monkeypatch):
-        global _active_fake_httpx_client  # noqa: PLW0603
-
-        class _TimeoutClient:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            async def get(self, url):
-                msg = "timed out"
-                raise httpx.TimeoutException(msg)
-
-        _active_fake_httpx_client = _TimeoutClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+    async def test_timeout_returns_retryable(self, install_fake_client):
+        install_fake_client(_HttpxTimeoutClient())
         result = await scraper.fetch_readme("apple", "swift-nio")
         assert "RETRYABLE" in result
         assert "apple/swift-nio" in result
+
+    @pytest.mark.anyio
+    async def test_repeated_failures_open_circuit(self, install_fake_client):
+        """After five GitHub failures the sixth README fetch fails fast without a request."""
+        client = _HttpxTimeoutClient()
+        install_fake_client(client)
+        for _ in range(5):
+            await scraper.fetch_readme("apple", "swift-nio")
+        calls_before = client.calls
+        result = await scraper.fetch_readme("apple", "swift-nio")
+        assert client.calls == calls_before
+        assert result.startswith("RETRYABLE")
+        assert "paused" in result
+        assert "apple/swift-nio" in result
@@ -6,12 +6,13 @@ from pathlib import Path
 
 import pytest
 
-from spm_search_mcp.scraper import _has_more_pages, parse_search_results
+from spm_search_mcp.models import PackageResult
+from spm_search_mcp.scraper import _has_more_pages, _parse_search_html, parse_search_results
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def networking_html() -> str:
     """Load the real SPI search results HTML fixture.
 
@@ -21,60 +22,56 @@ def networking_html() -> str:
     return (FIXTURES_DIR / "spi_search_networking.html").read_text(encoding="utf-8")
 
 
+@pytest.fixture(scope="session")
+def parsed_networking_results(networking_html: str) -> list[PackageResult]:
+    """Parse the fixture once; tests only read the results, so sharing them is safe."""
+    return parse_search_results(networking_html)
+
+
 class TestParseSearchResults:
     """Verify HTML parsing against a real SPI response."""
 
-    def test_returns_results(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert len(results) > 0
+    def test_returns_results(self, parsed_networking_results: list[PackageResult]):
+        assert len(parsed_networking_results) > 0
 
-    def test_result_count(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert len(results) == 16
+    def test_result_count(self, parsed_networking_results: list[PackageResult]):
+        assert len(parsed_networking_results) == 16
 
-    def test_first_result_name(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert results[0].name == "Networking"
+    def test_first_result_name(self, parsed_networking_results: list[PackageResult]):
+        assert parsed_networking_results[0].name == "Networking"
 
-    def test_first_result_author(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert results[0].author == "freshOS"
+    def test_first_result_author(self, parsed_networking_results: list[PackageResult]):
+        assert parsed_networking_results[0].author == "freshOS"
 
-    def test_first_result_stars(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert results[0].stars is not None
-        assert results[0].stars > 0
+    def test_first_result_stars(self, parsed_networking_results: list[PackageResult]):
+        assert parsed_networking_results[0].stars is not None
+        assert parsed_networking_results[0].stars > 0
 
-    def test_first_result_description(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert len(results[0].description) > 0
+    def test_first_result_description(self, parsed_networking_results: list[PackageResult]):
+        assert len(parsed_networking_results[0].description) > 0
 
-    def test_urls_constructed(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        first = results[0]
+    def test_urls_constructed(self, parsed_networking_results: list[PackageResult]):
+        first = parsed_networking_results[0]
         assert first.url == "https://swiftpackageindex.com/freshOS/Networking"
         assert first.github_url == "https://github.com/freshOS/Networking"
 
-    def test_last_activity_present(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert results[0].last_activity is not None
-        assert "ago" in results[0].last_activity.lower() or "active" in results[0].last_activity.lower()
+    def test_last_activity_present(self, parsed_networking_results: list[PackageResult]):
+        last_activity = parsed_networking_results[0].last_activity
+        assert last_activity is not None
+        assert "ago" in last_activity.lower() or "active" in last_activity.lower()
 
-    def test_keywords_extracted(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        assert "networking" in results[0].keywords
+    def test_keywords_extracted(self, parsed_networking_results: list[PackageResult]):
+        assert "networking" in parsed_networking_results[0].keywords
 
-    def test_alamofire_stars_in_thousands(self, networking_html: str):
+    def test_alamofire_stars_in_thousands(self, parsed_networking_results: list[PackageResult]):
         """Verify comma-separated star counts parse correctly (e.g. '42,352 stars')."""
-        results = parse_search_results(networking_html)
-        alamofire = next((r for r in results if r.name == "Alamofire"), None)
+        alamofire = next((r for r in parsed_networking_results if r.name == "Alamofire"), None)
         assert alamofire is not None
         assert alamofire.stars is not None
         assert alamofire.stars > 40000
 
-    def test_all_results_have_required_fields(self, networking_html: str):
-        results = parse_search_results(networking_html)
-        for result in results:
+    def test_all_results_have_required_fields(self, parsed_networking_results: list[PackageResult]):
+        for result in parsed_networking_results:
             assert result.name
             assert result.url.startswith("https://swiftpackageindex.com/")
             assert result.github_url.startswith("https://github.com/")
@@ -117,3 +114,35 @@ class TestHasMorePages:
         </body></html>
         """
         assert _has_more_pages(html) is False
+
+
+class TestParseSearchHtml:
+    """Verify the fused single-parse helper used by search_packages."""
+
+    def test_matches_separate_parsers(self, networking_html: str):
+        results, has_more = _parse_search_html(networking_html)
+        assert results == parse_search_results(networking_html)
+        assert has_more is _has_more_pages(networking_html)
+
+    def test_detects_next_page(self):
+        html = """
+        <html><body>
+        <section class="package-results">
+            <ul><li><a href="/owner/repo"><h4>Pkg</h4></a></li></ul>
+            <ul class="pagination"><li class="next"><a href="/search?query=swift&page=2">Next</a></li></ul>
+        </section>
+        </body></html>
+        """
+        results, has_more = _parse_search_html(html)
+        assert [r.name for r in results] == ["Pkg"]
+        assert has_more is True
+
+    def test_bytes_input_matches_str(self, networking_html: str):
+        """search_packages hands the parser raw response bytes."""
+        assert _parse_search_html(networking_html.encode()) == _parse_search_html(networking_html)
+
+    def test_unvalidated_results_pass_validation(self, parsed_networking_results: list[PackageResult]):
+        """Results are built with model_construct, so check they would have validated anyway."""
+        assert parsed_networking_results
+        for result in parsed_networking_results:
+            assert PackageResult.model_validate(result.model_dump()) == result
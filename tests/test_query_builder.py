@@ -2,117 +2,135 @@
 
 from __future__ import annotations
 
+import inspect
+from typing import Any
+
+import pytest
+
 from spm_search_mcp.models import Platform, ProductType
-from spm_search_mcp.scraper import build_query
+from spm_search_mcp.scraper import _QUERY_FIELDS, build_query
 
 
 class TestBuildQuery:
     """Verify that structured params assemble into correct SPI filter syntax."""
 
-    def test_freetext_only(self):
-        assert build_query("networking") == "networking"
+    @pytest.mark.parametrize(
+        ("args", "kwargs", "expected"),
+        [
+            pytest.param(("networking",), {}, "networking", id="freetext_only"),
+            pytest.param((), {"min_stars": 0}, "stars:>=0", id="zero_min_stars_is_kept"),
+            pytest.param(("fluent",), {"author": "vapor"}, "fluent author:vapor", id="author_filter"),
+            pytest.param((), {"keyword": "accessibility"}, "keyword:accessibility", id="keyword_filter"),
+            pytest.param(("http",), {"min_stars": 500}, "http stars:>=500", id="min_stars"),
+            pytest.param((), {"max_stars": 100}, "stars:<=100", id="max_stars"),
+            pytest.param(("ui",), {"platforms": [Platform.IOS]}, "ui platform:ios", id="single_platform"),
+            pytest.param(
+                ("testing",),
+                {"platforms": [Platform.IOS, Platform.LINUX]},
+                "testing platform:ios,linux",
+                id="multiple_platforms",
+            ),
+            pytest.param((), {"platforms": [Platform.VISIONOS]}, "platform:visionos", id="visionos_platform"),
+            pytest.param((), {"license_filter": "compatible"}, "license:compatible", id="license_compatible"),
+            pytest.param((), {"license_filter": "mit"}, "license:mit", id="license_specific"),
+            pytest.param(
+                ("charts",),
+                {"last_activity_after": "2024-01-01"},
+                "charts last_activity:>=2024-01-01",
+                id="last_activity_after",
+            ),
+            pytest.param(
+                ("charts",),
+                {"last_activity_before": "2023-12-31"},
+                "charts last_activity:<=2023-12-31",
+                id="last_activity_before",
+            ),
+            pytest.param((), {"last_commit_after": "2024-06-15"}, "last_commit:>=2024-06-15", id="last_commit_after"),
+            pytest.param((), {"last_commit_before": "2023-12-31"}, "last_commit:<=2023-12-31", id="last_commit_before"),
+            pytest.param((), {"product_type": ProductType.LIBRARY}, "product:library", id="product_type_library"),
+            pytest.param((), {"product_type": ProductType.EXECUTABLE}, "product:executable", id="product_type_executable"),
+            pytest.param((), {"product_type": ProductType.MACRO}, "product:macro", id="macro_product_type"),
+            pytest.param(("fluent",), {"author": "!vapor"}, "fluent author:!vapor", id="author_exclusion_prefix"),
+            pytest.param((), {"keyword": "!deprecated"}, "keyword:!deprecated", id="keyword_exclusion_prefix"),
+        ],
+    )
+    def test_exact_query(self, args: tuple[str, ...], kwargs: dict[str, Any], expected: str):
+        assert build_query(*args, **kwargs) == expected
+
+    @pytest.mark.parametrize(
+        ("args", "kwargs", "expected_parts"),
+        [
+            pytest.param(("json",), {"min_stars": 50, "max_stars": 1000}, ["stars:>=50", "stars:<=1000"], id="stars_range"),
+            pytest.param(
+                (),
+                {"last_activity_after": "2024-01-01", "last_activity_before": "2024-12-31"},
+                ["last_activity:>=2024-01-01", "last_activity:<=2024-12-31"],
+                id="last_activity_date_window",
+            ),
+            pytest.param(
+                (),
+                {"last_commit_after": "2024-01-01", "last_commit_before": "2024-12-31"},
+                ["last_commit:>=2024-01-01", "last_commit:<=2024-12-31"],
+                id="last_commit_date_window",
+            ),
+            # All filters combine with spaces (SPI uses AND logic).
+            pytest.param(
+                ("networking",),
+                {
+                    "author": "apple",
+                    "keyword": "server",
+                    "min_stars": 100,
+                    "platforms": [Platform.IOS, Platform.MACOS],
+                    "license_filter": "mit",
+                    "last_activity_after": "2024-01-01",
+                    "last_activity_before": "2024-06-30",
+                    "product_type": ProductType.LIBRARY,
+                },
+                [
+                    "networking",
+                    "author:apple",
+                    "keyword:server",
+                    "stars:>=100",
+                    "platform:ios,macos",
+                    "license:mit",
+                    "last_activity:>=2024-01-01",
+                    "last_activity:<=2024-06-30",
+                    "product:library",
+                ],
+                id="all_filters_combined",
+            ),
+        ],
+    )
+    def test_query_contains(self, args: tuple[str, ...], kwargs: dict[str, Any], expected_parts: list[str]):
+        parts = build_query(*args, **kwargs).split()
+        for expected in expected_parts:
+            assert expected in parts
 
     def test_empty_query(self):
         assert not build_query()
 
-    def test_author_filter(self):
-        assert build_query("fluent", author="vapor") == "fluent author:vapor"
-
-    def test_keyword_filter(self):
-        assert build_query(keyword="accessibility") == "keyword:accessibility"
-
-    def test_min_stars(self):
-        assert build_query("http", min_stars=500) == "http stars:>=500"
-
-    def test_max_stars(self):
-        assert build_query(max_stars=100) == "stars:<=100"
-
-    def test_stars_range(self):
-        result = build_query("json", min_stars=50, max_stars=1000)
-        assert "stars:>=50" in result
-        assert "stars:<=1000" in result
-
-    def test_single_platform(self):
-        assert build_query("ui", platforms=[Platform.IOS]) == "ui platform:ios"
-
-    def test_multiple_platforms(self):
-        result = build_query("testing", platforms=[Platform.IOS, Platform.LINUX])
-        assert result == "testing platform:ios,linux"
-
-    def test_license_compatible(self):
-        assert build_query(license_filter="compatible") == "license:compatible"
-
-    def test_license_specific(self):
-        assert build_query(license_filter="mit") == "license:mit"
-
-    def test_last_activity_after(self):
-        result = build_query("charts", last_activity_after="2024-01-01")
-        assert result == "charts last_activity:>=2024-01-01"
-
-    def test_last_activity_before(self):
-        result = build_query("charts", last_activity_before="2023-12-31")
-        assert result == "charts last_activity:<=2023-12-31"
-
-    def test_last_activity_date_window(self):
-        result = build_query(last_activity_after="2024-01-01", last_activity_before="2024-12-31")
-        assert "last_activity:>=2024-01-01" in result
-        assert "last_activity:<=2024-12-31" in result
-
-    def test_last_commit_after(self):
-        result = build_query(last_commit_after="2024-06-15")
-        assert result == "last_commit:>=2024-06-15"
-
-    def test_last_commit_before(self):
-        result = build_query(last_commit_before="2023-12-31")
-        assert result == "last_commit:<=2023-12-31"
-
-    def test_last_commit_date_window(self):
-        result = build_query(last_commit_after="2024-01-01", last_commit_before="2024-12-31")
-        assert "last_commit:>=2024-01-01" in result
-        assert "last_commit:<=2024-12-31" in result
-
-    def test_product_type_library(self):
-        assert build_query(product_type=ProductType.LIBRARY) == "product:library"
-
-    def test_product_type_executable(self):
-        assert build_query(product_type=ProductType.EXECUTABLE) == "product:executable"
-
-    def test_all_filters_combined(self):
-        """All filters combine with spaces (SPI uses AND logic)."""
-        result = build_query(
-            "networking",
-            author="apple",
-            keyword="server",
-            min_stars=100,
-            platforms=[Platform.IOS, Platform.MACOS],
-            license_filter="mit",
-            last_activity_after="2024-01-01",
-            last_activity_before="2024-06-30",
-            product_type=ProductType.LIBRARY,
-        )
-        parts = result.split()
-        assert "networking" in parts
-        assert "author:apple" in parts
-        assert "keyword:server" in parts
-        assert "stars:>=100" in parts
-        assert "platform:ios,macos" in parts
-        assert "license:mit" in parts
-        assert "last_activity:>=2024-01-01" in parts
-        assert "last_activity:<=2024-06-30" in parts
-        assert "product:library" in parts
-
-    def test_visionos_platform(self):
-        result = build_query(platforms=[Platform.VISIONOS])
-        assert result == "platform:visionos"
-
-    def test_macro_product_type(self):
-        result = build_query(product_type=ProductType.MACRO)
-        assert result == "product:macro"
-
-    def test_author_exclusion_prefix(self):
-        result = build_query("fluent", author="!vapor")
-        assert result == "fluent author:!vapor"
-
-    def test_keyword_exclusion_prefix(self):
-        result = build_query(keyword="!deprecated")
-        assert result == "keyword:!deprecated"
+    def test_field_table_covers_every_filter_parameter(self):
+        filter_params = set(inspect.signature(build_query).parameters) - {"query"}
+        assert {name for name, _ in _QUERY_FIELDS} == filter_params
+
+
+class TestCanonicalQuery:
+    """Verify equivalent filter sets build identical query strings."""
+
+    def test_platform_order_is_canonical(self):
+        assert build_query(platforms=[Platform.LINUX, Platform.IOS]) == build_query(platforms=[Platform.IOS, Platform.LINUX])
+
+    def test_duplicate_platforms_collapse(self):
+        assert build_query(platforms=[Platform.IOS, Platform.IOS]) == "platform:ios"
+
+    def test_whitespace_collapsed(self):
+        assert build_query("  swift   nio ") == "swift nio"
+
+    def test_duplicate_tokens_dropped(self):
+        assert build_query("swift author:vapor", author="vapor") == "swift author:vapor"
+
+    def test_free_text_filter_key_lowercased(self):
+        assert build_query("Author:apple networking") == "author:apple networking"
+
+    def test_unknown_key_left_alone(self):
+        assert build_query("Foo:Bar") == "Foo:Bar"
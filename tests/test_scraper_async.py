@@ -2,27 +2,106 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock
 
+import httpx
 import pytest
 
+from spm_search_mcp import scraper
+from spm_search_mcp.models import Platform, ProductType
 from spm_search_mcp.scraper import fetch_readme, search_packages
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _make_http_mock(status_code: int = 200, text: str = "") -> SimpleNamespace:
+    """A plain stand-in for httpx.Response carrying only the attributes the scraper reads."""
+    return SimpleNamespace(
+        status_code=status_code,
+        text=text,
+        content=text.encode(),
+        http_version="HTTP/1.1",
+        headers={},
+        request=SimpleNamespace(method="GET"),
+        raise_for_status=lambda: None,
+    )
+
+
+# Shared by every test that only needs "not found": nothing inspects or mutates it.
+_MOCK_404 = _make_http_mock(404)
+
+# One sample per build_query filter. Tests index it by _QUERY_FIELDS, so a filter
+# added without a sample fails with a KeyError instead of going untested.
+_FILTER_SAMPLES: dict[str, Any] = {
+    "author": "apple",
+    "keyword": "networking",
+    "min_stars": 10,
+    "max_stars": 1000,
+    "platforms": [Platform.IOS],
+    "license_filter": "mit",
+    "last_activity_after": "2024-01-01",
+    "last_activity_before": "2025-01-01",
+    "last_commit_after": "2024-01-01",
+    "last_commit_before": "2025-01-01",
+    "product_type": ProductType.LIBRARY,
+}
+
+
+@pytest.fixture
+def mock_client(install_fake_client: Callable[[Any], None]) -> AsyncMock:
+    """An AsyncMock installed as the shared client; tests script mock_client.get.
+
+    README probes use HEAD, so HEAD answers exactly like the scripted GET.
+    """
+    client = AsyncMock()
+    client.head = client.get
+    install_fake_client(client)
+    return client
+
+
+class TestSharedClient:
+    @pytest.mark.anyio
+    async def test_client_reused_per_host(self):
+        try:
+            first = await scraper._get_client(scraper.SPI_BASE_URL)
+            second = await scraper._get_client(scraper.SPI_BASE_URL)
+            github = await scraper._get_client(scraper.GITHUB_RAW_URL)
+            assert first is second
+            assert github is not first
+            assert github.headers["User-Agent"] == scraper.GITHUB_HEADERS["User-Agent"]
+            assert first.headers["Accept-Encoding"] == github.headers["Accept-Encoding"] == "gzip, br"
+        finally:
+            await scraper.close_clients()
 
-def _make_http_mock(status_code: int = 200, text: str = "") -> MagicMock:
-    response = MagicMock()
-    response.status_code = status_code
-    response.text = text
-    response.raise_for_status = MagicMock()
-    return response
+    @pytest.mark.anyio
+    async def test_connect_timeout_bounds_retried_attempts(self):
+        try:
+            client = await scraper._get_client(scraper.SPI_BASE_URL)
+            assert client.timeout.connect == pytest.approx(5.0)
+            assert client.timeout.read == pytest.approx(15.0)
+        finally:
+            await scraper.close_clients()
 
+    @pytest.mark.anyio
+    async def test_close_clients_closes_and_forgets(self):
+        client = await scraper._get_client(scraper.SPI_BASE_URL)
+        await scraper.close_clients()
+        assert client.is_closed
+        assert not scraper._clients
 
-def _patch_client(mock_client: AsyncMock):
-    """Return a patch context that wires mock_client as the httpx.AsyncClient instance."""
-    mock_ctx = AsyncMock()
-    mock_ctx.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_ctx.__aexit__ = AsyncMock(return_value=False)
-    return patch("spm_search_mcp.scraper.httpx.AsyncClient", return_value=mock_ctx)
+    @pytest.mark.anyio
+    async def test_closed_client_is_replaced(self):
+        try:
+            client = await scraper._get_client(scraper.SPI_BASE_URL)
+            await client.aclose()
+            assert await scraper._get_client(scraper.SPI_BASE_URL) is not client
+        finally:
+            await scraper.close_clients()
 
 
 class TestSearchPackages:
@@ -34,7 +113,35 @@ class TestSearchPackages:
         assert "Provide a search query" in result.next_step
 
     @pytest.mark.anyio
-    async def test_valid_query_parses_results(self):
+    async def test_no_arguments_skip_query_building(self, monkeypatch):
+        def unexpected_build_query(*_args, **_kwargs):
+            pytest.fail("build_query should not run when no search arguments were given")
+
+        monkeypatch.setattr(scraper, "build_query", unexpected_build_query)
+        result = await search_packages(query="   ")
+        assert result.result_count == 0
+
+    @pytest.mark.anyio
+    async def test_zero_star_filter_is_not_treated_as_empty(self, mock_client: AsyncMock):
+        mock_client.get.return_value = _make_http_mock(200, "<html></html>")
+
+        result = await search_packages(min_stars=0)
+
+        assert result.query == "stars:>=0"
+        mock_client.get.assert_awaited_once()
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("name", [name for name, _ in scraper._QUERY_FIELDS])
+    async def test_any_single_filter_bypasses_empty_query_answer(self, mock_client: AsyncMock, name: str):
+        mock_client.get.return_value = _make_http_mock(200, "<html></html>")
+
+        result = await search_packages(**{name: _FILTER_SAMPLES[name]})
+
+        assert "Provide a search query" not in result.next_step
+        mock_client.get.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_valid_query_parses_results(self, mock_client: AsyncMock):
         html = """
         <html><body>
         <section class="package-results">
@@ -47,31 +154,55 @@ class TestSearchPackages:
         </section>
         </body></html>
         """
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, html)
 
-        with _patch_client(mock_client):
-            result = await search_packages(query="networking")
+        result = await search_packages(query="networking")
 
         assert result.result_count == 1
         assert result.results[0].name == "SwiftNIO"
         assert result.results[0].stars == 10000
         assert "get_package_readme" in result.next_step
 
+    def test_parse_slots_rebind_after_close(self):
+        """Contended parse slots must not stay bound to a loop the lifespan has shut down."""
+
+        async def contended_parses():
+            pages = [b"<html></html>"] * (scraper._PARSE_CONCURRENCY * 2)
+            await asyncio.gather(*(scraper._parse_search_html_in_thread(page) for page in pages))
+            await scraper.close_clients()
+
+        asyncio.run(contended_parses())
+        asyncio.run(contended_parses())
+
     @pytest.mark.anyio
-    async def test_no_results_suggests_broadening(self):
+    async def test_parse_runs_off_the_event_loop_thread(self, monkeypatch, mock_client: AsyncMock):
+        parse_threads = []
+        real_parse = scraper._parse_search_html
+
+        def recording_parse(html):
+            parse_threads.append(threading.get_ident())
+            return real_parse(html)
+
+        mock_client.get.return_value = _make_http_mock(200, "<html></html>")
+
+        monkeypatch.setattr(scraper, "_parse_search_html", recording_parse)
+        await search_packages(query="networking")
+
+        assert parse_threads
+        assert parse_threads[0] != threading.get_ident()
+
+    @pytest.mark.anyio
+    async def test_no_results_suggests_broadening(self, mock_client: AsyncMock):
         html = "<html><body><section class='package-results'><ul></ul></section></body></html>"
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, html)
 
-        with _patch_client(mock_client):
-            result = await search_packages(query="xyznotfound123")
+        result = await search_packages(query="xyznotfound123")
 
         assert result.result_count == 0
         assert "broadening" in result.next_step
 
     @pytest.mark.anyio
-    async def test_has_more_includes_next_page_hint(self):
+    async def test_has_more_includes_next_page_hint(self, mock_client: AsyncMock):
         html = """
         <html><body>
         <section class="package-results">
@@ -84,73 +215,346 @@ class TestSearchPackages:
         </ul>
         </body></html>
         """
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, html)
 
-        with _patch_client(mock_client):
-            result = await search_packages(query="swift", page=1)
+        result = await search_packages(query="swift", page=1)
 
         assert result.has_more is True
         assert "page=2" in result.next_step
 
 
+class TestSearchCache:
+    @pytest.mark.anyio
+    async def test_repeat_search_served_from_cache(self, mock_client: AsyncMock):
+        html = "<html><body><section class='package-results'><ul></ul></section></body></html>"
+        mock_client.get.return_value = _make_http_mock(200, html)
+
+        await search_packages(query="swift  nio")
+        result = await search_packages(query="swift nio")
+
+        assert mock_client.get.await_count == 1
+        assert result.result_count == 0
+
+    @pytest.mark.anyio
+    async def test_error_status_not_cached(self, mock_client: AsyncMock):
+        mock_client.get.return_value = _make_http_mock(503)
+
+        await search_packages(query="swift")
+        result = await search_packages(query="swift")
+
+        assert mock_client.get.await_count == 2
+        assert "RETRYABLE" in result.next_step
+
+
+class TestPrefetch:
+    _PAGED_HTML = """
+        <html><body>
+        <section class="package-results"><ul><li><a href="/owner/repo"><h4>Pkg</h4></a></li></ul></section>
+        <ul class="pagination"><li class="next"><a href="/search?query=swift&page=2">Next</a></li></ul>
+        </body></html>
+        """
+
+    @pytest.mark.anyio
+    async def test_next_page_prefetched_when_enabled(self, mock_client: AsyncMock, monkeypatch):
+        monkeypatch.setenv("SPM_PREFETCH", "1")
+        mock_client.get.return_value = _make_http_mock(200, self._PAGED_HTML)
+
+        await search_packages(query="swift")
+        await asyncio.gather(*scraper._background_tasks)
+        await search_packages(query="swift", page=2)
+
+        requested = [call.kwargs["params"] for call in mock_client.get.await_args_list]
+        assert requested == [{"query": "swift"}, {"query": "swift", "page": 2}]
+
+    @pytest.mark.anyio
+    async def test_page_requested_during_prefetch_joins_it(self, mock_client: AsyncMock, monkeypatch):
+        monkeypatch.setenv("SPM_PREFETCH", "1")
+        release_page_two = asyncio.Event()
+
+        async def get(_url, params):
+            if params.get("page") == 2:
+                await release_page_two.wait()
+            return _make_http_mock(200, self._PAGED_HTML)
+
+        mock_client.get.side_effect = get
+        await search_packages(query="swift")  # schedules the page 2 prefetch, held in flight
+        page_two = asyncio.create_task(search_packages(query="swift", page=2))
+        await asyncio.sleep(0.01)
+        release_page_two.set()
+        result = await page_two
+        await asyncio.gather(*scraper._background_tasks)
+
+        pages = [call.kwargs["params"].get("page") for call in mock_client.get.await_args_list]
+        assert pages.count(2) == 1
+        assert result.result_count == 1
+
+    @pytest.mark.anyio
+    async def test_no_prefetch_by_default(self, mock_client: AsyncMock, monkeypatch):
+        monkeypatch.delenv("SPM_PREFETCH", raising=False)
+        mock_client.get.return_value = _make_http_mock(200, self._PAGED_HTML)
+
+        await search_packages(query="swift")
+
+        assert not scraper._background_tasks
+        assert mock_client.get.await_count == 1
+
+    @pytest.mark.anyio
+    async def test_prefetch_failure_is_logged_not_raised(self, mock_client: AsyncMock, caplog):
+        mock_client.get.side_effect = RuntimeError("boom")
+
+        await scraper._prefetch_search_page("swift", 2)
+
+        assert "Prefetch of page 2" in caplog.text
+
+
+class TestHostConcurrency:
+    """Verify per-host semaphores cap in-flight requests."""
+
+    @pytest.mark.anyio
+    async def test_readme_probes_respect_github_limit(self, mock_client: AsyncMock, monkeypatch):
+        monkeypatch.setenv("SPM_GITHUB_CONCURRENCY", "2")
+        in_flight = 0
+        peak = 0
+
+        async def head(_url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return _MOCK_404
+
+        mock_client.get.side_effect = head
+
+        await fetch_readme("owner", "repo")
+
+        assert mock_client.get.await_count == 10
+        assert peak == 2
+
+    @pytest.mark.anyio
+    async def test_default_github_limit_admits_one_full_probe_wave(self, mock_client: AsyncMock):
+        in_flight = 0
+        peak = 0
+
+        async def head(_url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return _MOCK_404
+
+        mock_client.get.side_effect = head
+
+        await fetch_readme("owner", "repo")
+
+        assert peak == mock_client.get.await_count == 10
+
+    def test_invalid_env_value_falls_back_to_default(self, monkeypatch):
+        monkeypatch.setenv("SPM_SPI_CONCURRENCY", "lots")
+        assert scraper._env_int("SPM_SPI_CONCURRENCY", 4) == 4
+
+
 class TestFetchReadme:
     @pytest.mark.anyio
-    async def test_found_on_main_with_truncation(self):
+    async def test_found_on_main_with_truncation(self, mock_client: AsyncMock):
         content = "A" * 5000
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, content)
 
-        with _patch_client(mock_client):
-            result = await fetch_readme("owner", "repo", max_length=4000)
+        result = await fetch_readme("owner", "repo", max_length=4000)
 
         assert result.startswith("A" * 4000)
         assert "truncated" in result
         assert "5000 chars" in result
 
     @pytest.mark.anyio
-    async def test_max_length_zero_returns_full_content(self):
+    async def test_max_length_zero_returns_full_content(self, mock_client: AsyncMock):
         content = "B" * 5000
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, content)
 
-        with _patch_client(mock_client):
-            result = await fetch_readme("owner", "repo", max_length=0)
+        result = await fetch_readme("owner", "repo", max_length=0)
 
         assert result == content
         assert "truncated" not in result
 
     @pytest.mark.anyio
-    async def test_content_within_limit_not_truncated(self):
+    async def test_content_within_limit_not_truncated(self, mock_client: AsyncMock):
         content = "Short README"
-        mock_client = AsyncMock()
         mock_client.get.return_value = _make_http_mock(200, content)
 
-        with _patch_client(mock_client):
-            result = await fetch_readme("owner", "repo", max_length=4000)
+        result = await fetch_readme("owner", "repo", max_length=4000)
 
         assert result == content
 
     @pytest.mark.anyio
-    async def test_main_404_falls_back_to_master(self):
+    async def test_main_404_falls_back_to_master(self, mock_client: AsyncMock):
         readme_content = "# README on master branch"
-        # 5 filenames on main (all 404) + README.md on master (200)
-        responses = [_make_http_mock(404)] * 5 + [_make_http_mock(200, readme_content)]
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(side_effect=responses)
+        # Every filename on main 404s; only README.md on master exists. Candidates are
+        # requested concurrently, so responses are keyed by URL rather than call order.
+        found = {f"{scraper.GITHUB_RAW_URL}/owner/repo/master/README.md": _make_http_mock(200, readme_content)}
+        mock_client.get.side_effect = lambda url: found.get(url, _MOCK_404)
 
-        with _patch_client(mock_client):
-            result = await fetch_readme("owner", "repo")
+        result = await fetch_readme("owner", "repo")
 
         assert result == readme_content
 
     @pytest.mark.anyio
-    async def test_not_found_anywhere_returns_message(self):
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(return_value=_make_http_mock(404))
+    async def test_candidates_fetched_concurrently_in_priority_order(self, mock_client: AsyncMock):
+        async def get(url):
+            # main/README.md answers last, but still outranks the faster master copy.
+            if url.endswith("/main/README.md"):
+                await asyncio.sleep(0.01)
+                return _make_http_mock(200, "main readme")
+            if url.endswith("/master/README.md"):
+                return _make_http_mock(200, "master readme")
+            return _MOCK_404
+
+        mock_client.get.side_effect = get
+
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "main readme"
+        assert mock_client.get.await_count == 10
+
+    @pytest.mark.anyio
+    async def test_head_probes_then_gets_only_the_winner(self, install_fake_client):
+        calls = []
+
+        class _Client:
+            async def head(self, url):
+                calls.append(("HEAD", url))
+                status = 200 if url.endswith("/master/README.md") else 404
+                return httpx.Response(status, request=httpx.Request("HEAD", url))
+
+            async def get(self, url):
+                calls.append(("GET", str(url)))
+                status = 200 if str(url).endswith("/master/README.md") else 404
+                return httpx.Response(status, text="# Master", request=httpx.Request("GET", url))
+
+        install_fake_client(_Client())
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "# Master"
+        # main/README.md is always fetched outright; the master copy only after its HEAD won.
+        assert [url for method, url in calls if method == "GET"] == [
+            f"{scraper.GITHUB_RAW_URL}/owner/repo/main/README.md",
+            f"{scraper.GITHUB_RAW_URL}/owner/repo/master/README.md",
+        ]
+
+    @pytest.mark.anyio
+    async def test_main_readme_found_in_one_round_trip(self, install_fake_client):
+        gets = []
+        never = asyncio.Event()
+
+        class _Client:
+            async def head(self, url):
+                # The other probes never answer: the main/README.md GET alone must decide.
+                await never.wait()
+
+            async def get(self, url):
+                gets.append(url)
+                return httpx.Response(200, text="# Main", request=httpx.Request("GET", url))
+
+        install_fake_client(_Client())
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "# Main"
+        assert gets == [f"{scraper.GITHUB_RAW_URL}/owner/repo/main/README.md"]
+
+    @pytest.mark.anyio
+    async def test_head_not_allowed_falls_back_to_get(self, install_fake_client):
+        class _NoHeadClient:
+            async def head(self, url):
+                return httpx.Response(405, request=httpx.Request("HEAD", url))
+
+            async def get(self, url):
+                return httpx.Response(200, text="# Via GET", request=httpx.Request("GET", url))
+
+        install_fake_client(_NoHeadClient())
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "# Via GET"
+
+    @pytest.mark.anyio
+    async def test_not_found_anywhere_returns_message(self, mock_client: AsyncMock):
+        mock_client.get.return_value = _MOCK_404
 
-        with _patch_client(mock_client):
-            result = await fetch_readme("owner", "repo")
+        result = await fetch_readme("owner", "repo")
 
         assert "README not found" in result
         assert "owner/repo" in result
+
+    @pytest.mark.anyio
+    async def test_found_readme_served_from_cache(self, mock_client: AsyncMock):
+        mock_client.get.return_value = _make_http_mock(200, "# Cached")
+
+        await fetch_readme("Owner", "Repo")
+        requests_made = mock_client.get.await_count
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "# Cached"
+        assert mock_client.get.await_count == requests_made
+
+    @pytest.mark.anyio
+    async def test_token_uses_single_api_request(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("SPM_GITHUB_TOKEN", "t0ken")
+        mock_client.get.return_value = _make_http_mock(200, "# From the API")
+
+        result = await fetch_readme("owner", "repo")
+
+        assert result == "# From the API"
+        mock_client.get.assert_awaited_once_with(
+            f"{scraper.GITHUB_API_URL}/repos/owner/repo/readme",
+            headers={"Authorization": "Bearer t0ken"},
+        )
+
+    @pytest.mark.anyio
+    async def test_api_quota_exhausted_is_retryable(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("SPM_GITHUB_TOKEN", "t0ken")
+        response = _make_http_mock(403)
+        response.headers = {"X-RateLimit-Remaining": "0", "Retry-After": "42"}
+        mock_client.get.return_value = response
+
+        result = await fetch_readme("owner", "repo")
+
+        assert result.startswith("RETRYABLE")
+        assert "Wait 42 seconds" in result
+
+    @pytest.mark.anyio
+    async def test_api_404_returns_not_found(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("SPM_GITHUB_TOKEN", "t0ken")
+        mock_client.get.return_value = _MOCK_404
+
+        result = await fetch_readme("owner", "repo")
+
+        assert "README not found" in result
+        mock_client.get.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_api_rejected_token_is_permanent(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("SPM_GITHUB_TOKEN", "expired")
+        mock_client.get.return_value = _make_http_mock(401)
+
+        result = await fetch_readme("owner", "repo")
+
+        assert result.startswith("PERMANENT")
+        assert "SPM_GITHUB_TOKEN" in result
+
+    @pytest.mark.anyio
+    async def test_api_server_error_is_retryable(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("SPM_GITHUB_TOKEN", "t0ken")
+        mock_client.get.return_value = _make_http_mock(503)
+
+        result = await fetch_readme("owner", "repo")
+
+        assert result.startswith("RETRYABLE")
+        assert "503" in result
+
+    @pytest.mark.anyio
+    async def test_ambient_github_token_is_ignored(self, monkeypatch, mock_client: AsyncMock):
+        monkeypatch.setenv("GITHUB_TOKEN", "from-ci")
+        mock_client.get.return_value = _MOCK_404
+
+        await fetch_readme("owner", "repo")
+
+        assert all(call.args[0].startswith(scraper.GITHUB_RAW_URL) for call in mock_client.get.await_args_list)
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+from typing import cast
 
-from bs4 import BeautifulSoup, Tag
+import pytest
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 from spm_search_mcp.scraper import (
     _build_search_url,
@@ -14,10 +15,9 @@ from spm_search_mcp.scraper import (
 )
 
 
-def _tag(html: str, selector: str) -> Tag:
-    soup = BeautifulSoup(html, "lxml")
-    el = soup.select_one(selector)
-    assert isinstance(el, Tag)
+def _tag(html: str, selector: str) -> LexborNode:
+    el = LexborHTMLParser(html).css_first(selector)
+    assert el is not None
     return el
 
 
@@ -32,40 +32,70 @@ class TestBuildSearchUrl:
         assert "&page=2" in url
         assert "query=networking" in url
 
+    def test_filter_syntax_is_form_encoded(self):
+        url = _build_search_url("stars:>500 platform:ios,macos")
+        assert url.endswith("?query=stars%3A%3E500+platform%3Aios%2Cmacos")
+
+
+# One document holds every metadata case; each <div id> names the case its <a> serves.
+_METADATA_CASES_HTML = """
+<div id="no_metadata"><a href="/o/r"><h4>Pkg</h4></a></div>
+<div id="has_docs"><a href="/o/r"><ul class="metadata"><li class="has_docs">Has docs</li></ul></a></div>
+<div id="no_digit_stars"><a href="/o/r"><ul class="metadata"><li class="stars">many stars</li></ul></a></div>
+<div id="small_stars"><a href="/o/r"><ul class="metadata"><li class="stars"><small>42,352 stars</small></li></ul></a></div>
+<div id="abbreviated_stars"><a href="/o/r"><ul class="metadata"><li class="stars">1.5k stars</li></ul></a></div>
+<div id="activity"><a href="/o/r"><ul class="metadata"><li class="activity">Active 3 days ago</li></ul></a></div>
+"""
+
+
+@pytest.fixture(scope="session")
+def metadata_links() -> dict[str, LexborNode]:
+    """Parse all metadata cases in one pass; tests only read the nodes, so sharing is safe."""
+    tree = LexborHTMLParser(_METADATA_CASES_HTML)
+    links = {}
+    for div in tree.css("div[id]"):
+        link = div.css_first("a")
+        assert link is not None
+        links[div.attributes["id"] or ""] = link
+    return links
+
 
 class TestExtractMetadata:
-    def test_no_metadata_ul_returns_defaults(self):
-        link = _tag("<div><a href='/o/r'><h4>Pkg</h4></a></div>", "a")
-        stars, last_activity, has_docs = _extract_metadata(link)
+    def test_no_metadata_ul_returns_defaults(self, metadata_links: dict[str, LexborNode]):
+        stars, last_activity, has_docs = _extract_metadata(metadata_links["no_metadata"])
         assert stars is None
         assert last_activity is None
         assert has_docs is False
 
-    def test_has_docs_flag_detected(self):
-        link = _tag(
-            '<div><a href="/o/r"><ul class="metadata"><li class="has_docs">Has docs</li></ul></a></div>',
-            "a",
-        )
-        _, _, has_docs = _extract_metadata(link)
+    def test_has_docs_flag_detected(self, metadata_links: dict[str, LexborNode]):
+        _, _, has_docs = _extract_metadata(metadata_links["has_docs"])
         assert has_docs is True
 
-    def test_stars_with_no_digit_word_stays_none(self):
-        link = _tag(
-            '<div><a href="/o/r"><ul class="metadata"><li class="stars">many stars</li></ul></a></div>',
-            "a",
-        )
-        stars, _, _ = _extract_metadata(link)
+    def test_stars_with_no_digit_word_stays_none(self, metadata_links: dict[str, LexborNode]):
+        stars, _, _ = _extract_metadata(metadata_links["no_digit_stars"])
         assert stars is None
 
-    def test_activity_text_captured(self):
-        link = _tag(
-            '<div><a href="/o/r"><ul class="metadata"><li class="activity">Active 3 days ago</li></ul></a></div>',
-            "a",
-        )
-        _, last_activity, _ = _extract_metadata(link)
+    def test_stars_read_from_small_label(self, metadata_links: dict[str, LexborNode]):
+        stars, _, _ = _extract_metadata(metadata_links["small_stars"])
+        assert stars == 42352
+
+    def test_abbreviated_stars_not_misread(self, metadata_links: dict[str, LexborNode]):
+        stars, _, _ = _extract_metadata(metadata_links["abbreviated_stars"])
+        assert stars is None
+
+    def test_activity_text_captured(self, metadata_links: dict[str, LexborNode]):
+        _, last_activity, _ = _extract_metadata(metadata_links["activity"])
         assert last_activity == "Active 3 days ago"
 
 
+class _RaisingNode:
+    """Stands in for a LexborNode whose lookup fails — the first thing the parser touches."""
+
+    def css_first(self, _selector):
+        msg = "simulated parse error"
+        raise ValueError(msg)
+
+
 class TestParsePackageFromLi:
     def test_no_anchor_returns_none(self):
         li = _tag("<ul><li><span>no link</span></li></ul>", "li")
@@ -86,10 +116,20 @@ class TestParsePackageFromLi:
         assert result.author == "owner"
         assert result.description == "A description"
 
+    def test_wrapped_elements_still_parsed(self):
+        li = _tag(
+            "<ul><li><div><a href='/owner/repo'><header><h4>MyPkg</h4></header>"
+            "<div><ul class='metadata'><li class='stars'><small>1,234 stars</small></li></ul></div>"
+            "</a></div></li></ul>",
+            "li",
+        )
+        result = _parse_package_from_li(li)
+        assert result is not None
+        assert result.name == "MyPkg"
+        assert result.stars == 1234
+
     def test_exception_inside_returns_none(self):
-        bad_li = MagicMock(spec=Tag)
-        bad_li.find.side_effect = ValueError("simulated parse error")
-        assert _parse_package_from_li(bad_li) is None
+        assert _parse_package_from_li(cast("LexborNode", _RaisingNode())) is None
 
 
 class TestParseSearchResultsEdgeCases:
@@ -104,6 +144,19 @@ class TestParseSearchResultsEdgeCases:
         """
         assert parse_search_results(html) == []
 
+    def test_empty_class_attribute_counts_as_classless(self):
+        html = """
+        <html><body>
+        <section class="package-results">
+            <ul class="filter-list"><li>Filter</li></ul>
+            <ul class=""><li><a href="/owner/repo"><h4>Pkg</h4><p>Desc</p></a></li></ul>
+            <ul class="pagination"><li>Page</li></ul>
+        </section>
+        </body></html>
+        """
+        results = parse_search_results(html)
+        assert [r.name for r in results] == ["Pkg"]
+
     def test_unparsable_result_skipped(self):
         html = """
         <html><body>
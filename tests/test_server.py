@@ -2,114 +2,142 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import httpx
 import pytest
 
 from spm_search_mcp import scraper
-from spm_search_mcp.server import get_package_readme, list_search_filters, mcp, search_swift_packages
+from spm_search_mcp.server import get_package_readme, http_lifespan, list_search_filters, mcp, search_swift_packages
+
+if TYPE_CHECKING:
+    from fastmcp.tools import Tool
+
+
+@pytest.fixture(scope="session")
+async def registered_tools() -> dict[str, Tool]:
+    """Registered tools by name. The tool set is fixed at import, so list it once per session."""
+    # LEARN: FastMCP v3 uses list_tools() returning a list of Tool objects
+    return {tool.name: tool for tool in await mcp.list_tools()}
 
 
 class TestServerToolRegistration:
     """Verify the FastMCP server exposes the expected tools."""
 
     @pytest.mark.anyio
-    async def test_tools_are_registered(self):
+    async def test_tools_are_registered(self, registered_tools: dict[str, Tool]):
         """Both search and readme tools should be discoverable."""
-        # LEARN: FastMCP v3 uses list_tools() returning a list of Tool objects
-        tools = await mcp.list_tools()
-        tool_names = {t.name for t in tools}
-        assert "search_swift_packages" in tool_names
-        assert "get_package_readme" in tool_names
-        assert "list_search_filters" in tool_names
+        assert "search_swift_packages" in registered_tools
+        assert "get_package_readme" in registered_tools
+        assert "list_search_filters" in registered_tools
 
     @pytest.mark.anyio
-    async def test_search_tool_has_description(self):
-        tools = await mcp.list_tools()
-        search_tool = next(t for t in tools if t.name == "search_swift_packages")
+    async def test_search_tool_has_description(self, registered_tools: dict[str, Tool]):
+        search_tool = registered_tools["search_swift_packages"]
         assert search_tool.description is not None
         assert "Swift Package Index" in search_tool.description
         assert "QUERY" in search_tool.description
 
     @pytest.mark.anyio
-    async def test_readme_tool_has_description(self):
-        tools = await mcp.list_tools()
-        readme_tool = next(t for t in tools if t.name == "get_package_readme")
+    async def test_readme_tool_has_description(self, registered_tools: dict[str, Tool]):
+        readme_tool = registered_tools["get_package_readme"]
         assert readme_tool.description is not None
         assert "README" in readme_tool.description
 
 
-class TestListSearchFilters:
-    """Verify the discovery tool returns valid enum values."""
-
-    def test_returns_platforms_and_product_types(self):
-        result = list_search_filters()
-        assert "platforms" in result
-        assert "product_types" in result
+@pytest.fixture(scope="session")
+def search_filters() -> dict[str, list[str]]:
+    """The discovery payload is static, so one call serves every test."""
+    return list_search_filters()
 
-    def test_platforms_contains_expected_values(self):
-        result = list_search_filters()
-        assert "ios" in result["platforms"]
-        assert "macos" in result["platforms"]
-        assert "linux" in result["platforms"]
 
-    def test_product_types_contains_expected_values(self):
-        result = list_search_filters()
-        assert "library" in result["product_types"]
-        assert "executable" in result["product_types"]
-        assert "macro" in result["product_types"]
+class TestListSearchFilters:
+    """Verify the discovery tool returns valid enum values."""
 
+    def test_returns_platforms_and_product_types(self, search_filters: dict[str, list[str]]):
+        assert {"platforms", "product_types"} <= search_filters.keys()
 
-# LEARN: We reuse the fake client pattern from test_error_handling to test the
-# server tools end-to-end without hitting the network.
+    def test_platforms_contains_expected_values(self, search_filters: dict[str, list[str]]):
+        assert {"ios", "macos", "linux"} <= frozenset(search_filters["platforms"])
 
-_active_fake_httpx_client: Any = None
+    def test_product_types_contains_expected_values(self, search_filters: dict[str, list[str]]):
+        assert {"library", "executable", "macro"} <= frozenset(search_filters["product_types"])
 
 
-def _fake_httpx_factory(**_kwargs: Any) -> Any:
-    """Swallow httpx.AsyncClient kwargs."""
-    return _active_fake_httpx_client
+# LEARN: The fakes never mutate their responses, so each one is built once at class
+# scope instead of re-parsing a URL and re-encoding a body on every request.
+_FAKE_REQUEST = httpx.Request("GET", f"{scraper.GITHUB_RAW_URL}/test/pkg/main/README.md")
+_RESPONSE_404 = httpx.Response(status_code=404, request=_FAKE_REQUEST)
 
 
 class _OkSearchClient:
     """Returns a minimal valid SPI search page."""
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, *args):
-        pass
-
-    async def get(self, url):
-        from unittest.mock import MagicMock
-
-        html = """<html><body><main><div class="inner">
+    _PAGE = httpx.Response(
+        status_code=200,
+        content=b"""<html><body><main><div class="inner">
         <section class="package-results">
         <ul><li><a href="/test/pkg"><h4>TestPkg</h4><p>A test package</p>
         <ul class="metadata"><li class="identifier"><small>test/pkg</small></li>
         <li class="stars"><small>42 stars</small></li></ul></a></li></ul>
-        <ul class="pagination"></ul></section></div></main></body></html>"""
-        resp = MagicMock()
-        resp.status_code = 200
-        resp.text = html
-        return resp
+        <ul class="pagination"></ul></section></div></main></body></html>""",
+        request=httpx.Request("GET", scraper.SPI_SEARCH_URL),
+    )
+
+    async def get(self, url, **_kwargs):
+        return self._PAGE
 
 
 class _OkReadmeClient:
     """Returns a README on first request."""
 
-    async def __aenter__(self):
-        return self
+    _FOUND = httpx.Response(status_code=200, text="# Hello\nThis is a test README.", request=_FAKE_REQUEST)
+
+    async def get(self, url):
+        return self._FOUND if "README.md" in url and "main" in url else _RESPONSE_404
+
+    head = get
+
+
+class _NotFoundClient:
+    """404s every README candidate."""
+
+    async def get(self, url):
+        return _RESPONSE_404
+
+    head = get
+
+
+class _LongReadmeClient:
+    """Returns a 10,000-character README.md on main."""
+
+    _FOUND = httpx.Response(status_code=200, text="x" * 10000, request=_FAKE_REQUEST)
+
+    async def get(self, url):
+        return self._FOUND if "README.md" in url and "main" in url else _RESPONSE_404
+
+    head = get
+
+
+class _RateLimitClient:
+    """Answers every request with 429."""
 
-    async def __aexit__(self, *args):
-        pass
+    _RATE_LIMITED = httpx.Response(status_code=429, request=_FAKE_REQUEST)
 
     async def get(self, url):
-        request = httpx.Request("GET", url)
-        if "README.md" in url and "main" in url:
-            return httpx.Response(status_code=200, text="# Hello\nThis is a test README.", request=request)
-        return httpx.Response(status_code=404, request=request)
+        return self._RATE_LIMITED
+
+    head = get
+
+
+class _ConnectErrorClient:
+    """Fails every request with a connection error."""
+
+    async def get(self, url):
+        msg = "connection refused"
+        raise httpx.ConnectError(msg)
+
+    head = get
 
 
 class TestSearchToolIntegration:
@@ -124,10 +152,8 @@ class TestSearchToolIntegration:
         assert "filter" in resp.next_step.lower()
 
     @pytest.mark.anyio
-    async def test_search_returns_results(self, monkeypatch):
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _OkSearchClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+    async def test_search_returns_results(self, install_fake_client):
+        install_fake_client(_OkSearchClient())
         resp = await search_swift_packages(query="test")
         assert resp.result_count > 0
         assert resp.results[0].name == "TestPkg"
@@ -138,108 +164,51 @@ class TestReadmeToolIntegration:
     """Test get_package_readme server tool end-to-end."""
 
     @pytest.mark.anyio
-    async def test_readme_found(self, monkeypatch):
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _OkReadmeClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+    async def test_readme_found(self, install_fake_client):
+        install_fake_client(_OkReadmeClient())
         # Calls through server.py lines 123-124
         result = await get_package_readme(owner="test", repo="pkg")
         assert "# Hello" in result
 
     @pytest.mark.anyio
-    async def test_readme_max_length_zero_means_no_limit(self, monkeypatch):
+    async def test_readme_max_length_zero_means_no_limit(self, install_fake_client):
         """max_length=0 should pass 999_999 to fetch_readme (PROGRESSIVE_DETAIL)."""
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _OkReadmeClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+        install_fake_client(_OkReadmeClient())
         # This exercises the max_length=0 branch on server.py line 123
         result = await get_package_readme(owner="test", repo="pkg", max_length=0)
         assert "# Hello" in result
 
     @pytest.mark.anyio
-    async def test_readme_not_found(self, monkeypatch):
-        """All filenames 404 → should return a helpful not-found message."""
-
-        class _NotFoundClient:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            async def get(self, url):
-                request = httpx.Request("GET", url)
-                return httpx.Response(status_code=404, request=request)
-
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _NotFoundClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
-        result = await get_package_readme(owner="nonexist", repo="repo")
-        assert "not found" in result.lower()
-        assert "nonexist/repo" in result
-
-    @pytest.mark.anyio
-    async def test_readme_truncation(self, monkeypatch):
+    async def test_readme_truncation(self, install_fake_client):
         """Long README should be truncated with a note."""
-
-        class _LongReadmeClient:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            async def get(self, url):
-                request = httpx.Request("GET", url)
-                if "README.md" in url and "main" in url:
-                    return httpx.Response(status_code=200, text="x" * 10000, request=request)
-                return httpx.Response(status_code=404, request=request)
-
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _LongReadmeClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
+        install_fake_client(_LongReadmeClient())
         result = await get_package_readme(owner="test", repo="pkg", max_length=100)
         assert "truncated" in result
         assert "10000" in result
 
     @pytest.mark.anyio
-    async def test_rate_limit_returns_retryable(self, monkeypatch):
-        """GitHub 429 should return a RETRYABLE message."""
-
-        class _RateLimitClient:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
+    @pytest.mark.parametrize(
+        ("client", "expected"),
+        [
+            pytest.param(_NotFoundClient(), "README not found", id="not-found"),
+            pytest.param(_RateLimitClient(), "RETRYABLE", id="rate-limited"),
+            pytest.param(_ConnectErrorClient(), "RETRYABLE", id="connect-error"),
+        ],
+    )
+    async def test_readme_failure_guidance(self, install_fake_client, client: Any, expected: str):
+        """404s everywhere, GitHub 429s and connection failures each return recovery guidance."""
+        install_fake_client(client)
+        result = await get_package_readme(owner="nonexist", repo="repo")
+        assert expected in result
+        assert "nonexist/repo" in result
 
-            async def get(self, url):
-                request = httpx.Request("GET", url)
-                return httpx.Response(status_code=429, request=request)
 
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _RateLimitClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
-        result = await get_package_readme(owner="test", repo="pkg")
-        assert "RETRYABLE" in result
+class TestHttpLifespan:
+    """Verify the server closes pooled HTTP clients on shutdown."""
 
     @pytest.mark.anyio
-    async def test_connect_error_returns_retryable(self, monkeypatch):
-        """Connection failure should return a RETRYABLE message."""
-
-        class _ConnectErrorClient:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            async def get(self, url):
-                msg = "connection refused"
-                raise httpx.ConnectError(msg)
-
-        global _active_fake_httpx_client  # noqa: PLW0603
-        _active_fake_httpx_client = _ConnectErrorClient()
-        monkeypatch.setattr(scraper.httpx, "AsyncClient", _fake_httpx_factory)
-        result = await get_package_readme(owner="test", repo="pkg")
-        assert "RETRYABLE" in result
+    async def test_lifespan_closes_clients(self):
+        client = await scraper._get_client(scraper.SPI_BASE_URL)
+        async with http_lifespan(mcp):
+            assert not client.is_closed
+        assert client.is_closed